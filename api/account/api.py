@@ -1,16 +1,17 @@
 from typing import Dict
 from django.http import HttpRequest
-from django.contrib.auth import aauthenticate, alogin, alogout
+from django.contrib.auth import alogin, alogout
 from django.utils.translation import gettext_lazy as _
-from ninja import Router
 from ninja.errors import AuthenticationError
 
 from account.models import User
+from api.timing import TimedRouter
 
+from . import emails, hashing
 from .helpers import adjango_auth
 from .schemas import *
 
-router = Router()
+router = TimedRouter()
 
 
 @router.get("/isauth")
@@ -21,14 +22,14 @@ async def is_authenticated(request: HttpRequest):
 
 @router.get("/", auth=adjango_auth, response=UserOutSchema)
 async def user_retrieve(request: HttpRequest):
-    user = await request.auser()
+    user = request.auth
     return user
 
 
 @router.post("/login/")
 async def user_login(request: HttpRequest, details: LoginSchema):
-    user = await aauthenticate(
-        request=request, username=details.email, password=details.password
+    user = await hashing.aauthenticate(
+        request, email=details.email, password=details.password
     )
 
     if user is None:
@@ -57,27 +58,33 @@ async def user_signup(request: HttpRequest, details: SignUpSchema):
             }
         }
 
+    error = await emails.acheck_deliverability(details.email)
+    if error:
+        return 400, {"details": {"email": error}}
+
     user = User(
         email=details.email, first_name=details.first_name, last_name=details.last_name
     )
-    user.set_password(details.password)
+    await hashing.aset_password(user, details.password)
     await user.asave()
     return 201, user
 
 
-@router.put("/", auth=adjango_auth, response={200: UserOutSchema, 409: Dict})
+@router.put("/", auth=adjango_auth, response={200: UserOutSchema, 409: Dict, 400: Dict})
 async def user_update(request: HttpRequest, details: UserInSchema):
-    user = await request.auser()
-
-    if (
-        user.email != details.email
-        and await User.objects.filter(email=details.email).aexists()
-    ):
-        return 409, {
-            "details": {
-                "email": _("The email is already taken."),
+    user = request.auth
+
+    if user.email != details.email:
+        if await User.objects.filter(email=details.email).aexists():
+            return 409, {
+                "details": {
+                    "email": _("The email is already taken."),
+                }
             }
-        }
+
+        error = await emails.acheck_deliverability(details.email)
+        if error:
+            return 400, {"details": {"email": error}}
 
     user.email = details.email
     user.first_name = details.first_name
@@ -97,14 +104,14 @@ async def user_password_update(request: HttpRequest, details: PasswordUpdateSche
     if details.conf_password != details.new_password:
         return 400, {"details": {"conf_password": _("Passwords must match.")}}
 
-    user = await request.auser()
+    user = request.auth
 
-    if not user.check_password(details.old_password):
+    if not await hashing.acheck_password(user, details.old_password):
         return 409, {
             "details": {"old_password": _("The old password provided is incorrect.")},
         }
 
-    user.set_password(details.new_password)
+    await hashing.aset_password(user, details.new_password)
     await user.asave()
 
     return user
@@ -1,6 +1,23 @@
 from django.apps import AppConfig
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
 
 
 class AccountConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'account'
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "account"
+
+    def ready(self):
+        from . import signals
+        from .models import User
+
+        for signal in (post_save, post_delete):
+            signal.connect(
+                receiver=signals.invalidate_user_receiver,
+                sender=User,
+                dispatch_uid="invalidate_user",
+            )
+        user_logged_out.connect(
+            receiver=signals.user_logged_out_receiver,
+            dispatch_uid="invalidate_logged_out_user",
+        )
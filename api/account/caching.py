@@ -0,0 +1,108 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def cache_key(user_id) -> str:
+    return f"account:user:{user_id}"
+
+
+async def acache_get(cache, key):
+    # Django 5.0 caches implement aget() with sync_to_async(). A local memory
+    # lookup never blocks, so it is done in place, without the thread hop.
+    if isinstance(cache, LocMemCache):
+        return cache.get(key)
+    return await cache.aget(key)
+
+
+async def acache_set(cache, key, value, timeout):
+    if isinstance(cache, LocMemCache):
+        cache.set(key, value, timeout)
+    else:
+        await cache.aset(key, value, timeout)
+
+
+async def aload_session(session):
+    """
+    Loads the session data the way SessionBase._get_session() does. The
+    cache-backed stores (cache, cached_db) are read straight from their
+    cache; only a miss falls back to the database in a thread.
+    """
+    if hasattr(session, "_session_cache"):
+        return
+
+    session.accessed = True
+    if session.session_key is None:
+        session._session_cache = {}
+        return
+
+    data = None
+    cache = getattr(session, "_cache", None)
+    if cache is not None:
+        try:
+            data = await acache_get(cache, session.cache_key)
+        except Exception:
+            data = None
+
+    if data is None:
+        data = await sync_to_async(session.load)()
+    session._session_cache = data
+
+
+def cached_user(cached, session_hash):
+    if cached is not None and constant_time_compare(cached[0], session_hash):
+        return cached[1]
+    return None
+
+
+def get_user(request):
+    """
+    auth.get_user() with the user row cached for USER_CACHE_TIMEOUT seconds.
+    The entry only serves the sessions that carry the auth hash it was
+    verified with, so a changed password is never served from the cache.
+    """
+    user_id = request.session.get(auth.SESSION_KEY)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if user_id is None or not session_hash:
+        return auth.get_user(request)
+
+    cache = user_cache()
+    key = cache_key(user_id)
+    user = cached_user(cache.get(key), session_hash)
+    if user is not None:
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        # get_user() may have rotated the hash of a session signed with a
+        # fallback secret.
+        session_hash = request.session.get(auth.HASH_SESSION_KEY)
+        cache.set(key, (session_hash, user), settings.USER_CACHE_TIMEOUT)
+
+    return user
+
+
+async def aget_user(request):
+    """get_user() without a thread hop when the session and user are cached."""
+    await aload_session(request.session)
+    user_id = request.session.get(auth.SESSION_KEY)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+
+    if user_id is not None and session_hash:
+        cached = await acache_get(user_cache(), cache_key(user_id))
+        user = cached_user(cached, session_hash)
+        if user is not None:
+            return user
+
+    return await sync_to_async(get_user)(request)
+
+
+def invalidate(user_id):
+    user_cache().delete(cache_key(user_id))
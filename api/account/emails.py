@@ -0,0 +1,94 @@
+"""
+Email address validation. The schemas only check the syntax, which needs
+no network. With EMAIL_VALIDATION = "deliverability" the views also check
+that the domain accepts email, through dnspython's async resolver: each
+domain is looked up at most once per EMAIL_DOMAIN_CACHE_TIMEOUT seconds
+and never for longer than EMAIL_VALIDATION_TIMEOUT seconds. A lookup that
+times out or finds no nameserver lets the address through, as
+email_validator does.
+"""
+
+import asyncio
+from typing import Optional
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+import email_validator
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from .caching import acache_get, acache_set
+
+OFFLINE = "offline"
+DELIVERABILITY = "deliverability"
+
+# Why a domain doesn't take email. The cache keeps the codes, so that the
+# messages are translated per request.
+MESSAGES = {
+    "no-mail": _("The domain name %(domain)s does not accept email."),
+    "no-domain": _("The domain name %(domain)s does not exist."),
+}
+
+
+def validate_syntax(email: str) -> email_validator.ValidatedEmail:
+    return email_validator.validate_email(email, check_deliverability=False)
+
+
+def cache_key(domain: str) -> str:
+    return f"account:email-domain:{domain}"
+
+
+async def resolve(resolver, domain: str, rdtype: str):
+    try:
+        return await resolver.resolve(domain, rdtype)
+    except dns.resolver.NoAnswer:
+        return []
+
+
+async def lookup(domain: str) -> Optional[str]:
+    """Why mail to the domain can't be delivered, as a MESSAGES code, or None."""
+    resolver = dns.asyncresolver.Resolver()
+    resolver.lifetime = settings.EMAIL_VALIDATION_TIMEOUT
+
+    try:
+        mx = await resolve(resolver, domain, "MX")
+        if mx:
+            # RFC 7505: a null MX only means the domain accepts no email.
+            if all(str(record.exchange) == "." for record in mx):
+                return "no-mail"
+            return None
+
+        for rdtype in ("A", "AAAA"):
+            if await resolve(resolver, domain, rdtype):
+                return None
+        return "no-mail"
+    except dns.resolver.NXDOMAIN:
+        return "no-domain"
+
+
+async def acheck_deliverability(email: str) -> Optional[str]:
+    """
+    The error message for an address whose domain doesn't accept email, or
+    None. Always None in the offline mode.
+    """
+    if settings.EMAIL_VALIDATION == OFFLINE:
+        return None
+
+    domain = validate_syntax(email).ascii_domain
+    key = cache_key(domain)
+    error = await acache_get(cache, key)
+
+    if error is None:
+        try:
+            error = await asyncio.wait_for(
+                lookup(domain), settings.EMAIL_VALIDATION_TIMEOUT
+            )
+        except (asyncio.TimeoutError, dns.exception.DNSException):
+            return None
+        # An empty string stands for a deliverable domain in the cache.
+        error = error or ""
+        await acache_set(cache, key, error, settings.EMAIL_DOMAIN_CACHE_TIMEOUT)
+
+    return str(MESSAGES[error] % {"domain": domain}) if error else None
@@ -0,0 +1,247 @@
+"""
+Password hashing off the event loop. PBKDF2 at production iteration counts
+takes tens of milliseconds of CPU per call, so the async views hand every
+hash and verify to a small, bounded thread pool (hashlib releases the GIL
+while it hashes). When HASHING_MAX_WORKERS are busy and HASHING_MAX_QUEUE
+calls are waiting, new ones fail fast with HashingBusy, answered with 503.
+"""
+
+import asyncio
+import inspect
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, load_backend, user_login_failed
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import (
+    check_password,
+    get_hasher,
+    identify_hasher,
+    make_password,
+)
+from django.core.exceptions import PermissionDenied
+
+from api.db.pool import release_connections
+
+
+class HashingBusy(Exception):
+    pass
+
+
+@dataclass
+class HashingStats:
+    completed: int = 0
+    rejected: int = 0
+    wait_seconds: float = 0
+    hash_seconds: float = 0
+
+
+def lower_priority(niceness: int):
+    # Linux schedules threads on their own, a hashing thread can yield the
+    # CPU to the ones serving requests.
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), niceness)
+    except (AttributeError, OSError):
+        pass
+
+
+class HashingExecutor:
+    def __init__(self, max_workers: int, max_queue: int, niceness: int = 0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(
+            max_workers,
+            thread_name_prefix="hashing",
+            initializer=lower_priority if niceness else None,
+            initargs=(niceness,),
+        )
+        self.lock = threading.Lock()
+        # Calls running or waiting for a worker.
+        self.pending = 0
+        self.running = 0
+        self.stats = HashingStats()
+
+    @property
+    def queued(self) -> int:
+        return self.pending - self.running
+
+    async def run(self, func, *args):
+        with self.lock:
+            if self.pending >= self.max_workers + self.max_queue:
+                self.stats.rejected += 1
+                raise HashingBusy
+            self.pending += 1
+
+        submitted = time.monotonic()
+
+        def call():
+            started = time.monotonic()
+            with self.lock:
+                self.running += 1
+                self.stats.wait_seconds += started - submitted
+            try:
+                return func(*args)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.stats.completed += 1
+                    self.stats.hash_seconds += time.monotonic() - started
+
+        try:
+            return await asyncio.wrap_future(self.executor.submit(call))
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def render_metrics(self) -> str:
+        with self.lock:
+            gauges = [
+                ("hashing_running", self.running, "Hashes being computed."),
+                ("hashing_queued", self.queued, "Hashes waiting for a worker."),
+            ]
+            counters = [
+                ("hashing_completed_total", self.stats.completed, "Hashes computed."),
+                (
+                    "hashing_rejected_total",
+                    self.stats.rejected,
+                    "Hashes refused because the queue was full.",
+                ),
+                (
+                    "hashing_wait_seconds_total",
+                    self.stats.wait_seconds,
+                    "Time spent waiting for a worker.",
+                ),
+                (
+                    "hashing_seconds_total",
+                    self.stats.hash_seconds,
+                    "Time spent hashing.",
+                ),
+            ]
+
+        lines = []
+        for kind, metrics in (("gauge", gauges), ("counter", counters)):
+            for name, value, help in metrics:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+_executor: Optional[HashingExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> HashingExecutor:
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = HashingExecutor(
+                settings.HASHING_MAX_WORKERS,
+                settings.HASHING_MAX_QUEUE,
+                settings.HASHING_NICENESS,
+            )
+        return _executor
+
+
+def must_update(encoded: str) -> bool:
+    """Whether the hash should be upgraded, as check_password()'s setter decides."""
+    preferred = get_hasher("default")
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+async def amake_password(password: str) -> str:
+    return await executor().run(make_password, password)
+
+
+async def aset_password(user, password: str):
+    user.password = await amake_password(password)
+    user._password = password
+
+
+async def acheck_password(user, password: str) -> bool:
+    """
+    user.check_password() with the hashing done by the executor. A valid
+    password whose hash is outdated is rehashed and saved.
+    """
+    if not await executor().run(check_password, password, user.password):
+        return False
+
+    if must_update(user.password):
+        await aset_password(user, password)
+        await user.asave(update_fields=["password"])
+    return True
+
+
+def _is_model_backend(backend) -> bool:
+    # Subclasses may override user_can_authenticate(), not authenticate().
+    return (
+        isinstance(backend, ModelBackend)
+        and type(backend).authenticate is ModelBackend.authenticate
+    )
+
+
+async def _amodel_authenticate(backend: ModelBackend, email: str, password: str):
+    """
+    ModelBackend.authenticate() without its thread hop: the user is loaded
+    by the async ORM and the password checked by the executor.
+    """
+    User = get_user_model()
+
+    try:
+        user = await User._default_manager.aget(**{User.USERNAME_FIELD: email})
+    except User.DoesNotExist:
+        # Hash anyway, so that response times don't tell which emails exist.
+        await amake_password(password)
+        return None
+
+    # Don't keep a pooled connection from other requests while hashing.
+    await sync_to_async(release_connections)()
+    if await acheck_password(user, password) and backend.user_can_authenticate(user):
+        return user
+    return None
+
+
+async def aauthenticate(request, email: str, password: str):
+    """
+    django.contrib.auth.aauthenticate() over AUTHENTICATION_BACKENDS, with
+    the ModelBackends checked by _amodel_authenticate(). Sends
+    user_login_failed when no backend accepts the credentials.
+    """
+    credentials = {"username": email, "password": password}
+
+    for path in settings.AUTHENTICATION_BACKENDS:
+        backend = load_backend(path)
+        try:
+            inspect.signature(backend.authenticate).bind(request, **credentials)
+        except TypeError:
+            # This backend doesn't accept these credentials.
+            continue
+
+        try:
+            if _is_model_backend(backend):
+                user = await _amodel_authenticate(backend, email, password)
+            else:
+                user = await sync_to_async(backend.authenticate)(request, **credentials)
+        except PermissionDenied:
+            # This backend says to stop here.
+            break
+
+        if user is not None:
+            user.backend = path
+            return user
+
+    await user_login_failed.asend(
+        sender=__name__, credentials={"username": email}, request=request
+    )
+    return None
@@ -1,7 +1,25 @@
+from typing import Any, Optional
+
+from django.conf import settings
 from django.http import HttpRequest
-from ninja.security import django_auth
-from asgiref.sync import sync_to_async
+from ninja.security import APIKeyCookie
+
+
+class AsyncSessionAuth(APIKeyCookie):
+    """
+    ninja's SessionAuth without the sync_to_async() around it. The user is
+    resolved once by request.auser() and handed to the view as request.auth.
+    """
+
+    param_name: str = settings.SESSION_COOKIE_NAME
+
+    async def __call__(self, request: HttpRequest) -> Optional[Any]:
+        key = self._get_key(request)
+        return await self.authenticate(request, key)
+
+    async def authenticate(self, request: HttpRequest, key: Optional[str]):
+        user = await request.auser()
+        return user if user.is_authenticated else None
 
 
-async def adjango_auth(request: HttpRequest):
-    return await sync_to_async(django_auth)(request)
+adjango_auth = AsyncSessionAuth()
@@ -0,0 +1,30 @@
+from functools import partial
+
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from . import caching
+
+
+def get_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = caching.get_user(request)
+    return request._cached_user
+
+
+async def auser(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = await caching.aget_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Serves request.user and request.auser() from the user cache. Both share
+    one lookup, so an auth check plus `await request.auser()` loads once.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_user(request))
+        request.auser = partial(auser, request)
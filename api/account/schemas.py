@@ -8,6 +8,8 @@ from pydantic import (
     field_validator,
 )
 
+from . import emails
+
 
 class UserOutSchema(Schema):
     email: str
@@ -69,7 +71,8 @@ class UserInSchema(Schema):
         )
 
         try:
-            email_validator.validate_email(e)
+            # Syntax only, the views check the domain (account.emails).
+            emails.validate_syntax(e)
         except email_validator.EmailNotValidError as e:
             raise ValueError(str(e.args[0]))
 
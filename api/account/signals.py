@@ -0,0 +1,10 @@
+from . import caching
+
+
+def invalidate_user_receiver(sender, instance, **kwargs):
+    caching.invalidate(instance.pk)
+
+
+def user_logged_out_receiver(sender, request, user, **kwargs):
+    if user is not None:
+        caching.invalidate(user.pk)
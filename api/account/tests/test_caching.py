@@ -0,0 +1,112 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cached_db import SessionStore
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import caching
+from ..caching import cache_key, user_cache
+from ..factories import UserFactory
+from ..helpers import adjango_auth
+
+
+@override_settings(
+    CACHES={**settings.CACHES, "sessions": settings.SESSION_CACHES["database"]}
+)
+class SharedSessionCacheTest(TestCase):
+    def setUp(self):
+        call_command("createcachetable", verbosity=0)
+        self.user = UserFactory.create()
+        self.client.force_login(self.user)
+        self.url = reverse("api-1.0.0:user_retrieve")
+
+    def test_logout_seen_by_other_workers(self):
+        self.client.get(self.url)
+
+        # Another worker has a backend instance of its own, on the same table.
+        other = caches.create_connection("sessions")
+        session_key = SessionStore(self.client.session.session_key).cache_key
+        self.assertIsNotNone(other.get(session_key))
+        self.assertIsNotNone(other.get(cache_key(self.user.pk)))
+
+        self.client.post(reverse("api-1.0.0:user_logout"))
+        self.assertIsNone(other.get(session_key))
+        self.assertIsNone(other.get(cache_key(self.user.pk)))
+
+    def test_shared_in_prod(self):
+        from api.settings import prod
+
+        self.assertEqual(
+            prod.CACHES["sessions"]["BACKEND"],
+            "django.core.cache.backends.db.DatabaseCache",
+        )
+
+
+class UserCacheTest(TestCase):
+    def setUp(self):
+        user_cache().clear()
+        self.user = UserFactory.create()
+        self.client.force_login(self.user)
+        self.url = reverse("api-1.0.0:user_retrieve")
+
+    def test_no_auth_queries(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["email"], self.user.email)
+
+    def test_invalidated_on_save(self):
+        self.client.get(self.url)
+
+        self.user.first_name = "Frank"
+        self.user.save()
+
+        self.assertEqual(self.client.get(self.url).json()["first_name"], "Frank")
+
+    def test_invalidated_on_logout(self):
+        self.client.get(self.url)
+
+        res = self.client.post(reverse("api-1.0.0:user_logout"))
+        self.assertEqual(res.status_code, 204)
+        self.assertIsNone(user_cache().get(cache_key(self.user.pk)))
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_other_session_hash(self):
+        other = UserFactory.build(pk=self.user.pk, email="other@gmail.com")
+        user_cache().set(cache_key(self.user.pk), ("other", other))
+
+        self.assertEqual(self.client.get(self.url).json()["email"], self.user.email)
+
+    def test_no_thread_hop(self):
+        self.client.get(self.url)
+
+        with mock.patch.object(
+            caching, "sync_to_async", side_effect=AssertionError("thread hop")
+        ):
+            res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+
+    def test_session_cache_miss(self):
+        user_cache().clear()
+
+        res = self.client.get(self.url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["email"], self.user.email)
+
+
+class AsyncSessionAuthTest(SimpleTestCase):
+    def test_anonymous(self):
+        request = RequestFactory().get("/")
+
+        async def auser():
+            return AnonymousUser()
+
+        request.auser = auser
+        self.assertIsNone(async_to_sync(adjango_auth)(request))
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+import dns.resolver
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..emails import acheck_deliverability
+from ..factories import UserFactory
+
+MX = [SimpleNamespace(preference=10, exchange="mx.example.org.")]
+
+
+def resolver(answers):
+    """A Resolver.resolve() answering from `answers`, by record type."""
+
+    async def resolve(self, domain, rdtype):
+        answer = answers.get(rdtype, dns.resolver.NoAnswer)
+        if isinstance(answer, type) and issubclass(answer, Exception):
+            raise answer
+        return answer
+
+    return mock.patch("dns.asyncresolver.Resolver.resolve", resolve)
+
+
+@override_settings(EMAIL_VALIDATION="deliverability", EMAIL_VALIDATION_TIMEOUT=1)
+class DeliverabilityTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def check(self, email="user@example.org"):
+        return async_to_sync(acheck_deliverability)(email)
+
+    def test_mx(self):
+        with resolver({"MX": MX}):
+            self.assertIsNone(self.check())
+
+    def test_a_fallback(self):
+        with resolver({"A": ["192.0.2.1"]}):
+            self.assertIsNone(self.check())
+
+    def test_null_mx(self):
+        with resolver({"MX": [SimpleNamespace(preference=0, exchange=".")]}):
+            self.assertIn("does not accept email", self.check())
+
+    def test_no_records(self):
+        with resolver({}):
+            self.assertIn("does not accept email", self.check())
+
+    def test_no_domain(self):
+        with resolver({"MX": dns.resolver.NXDOMAIN}):
+            self.assertEqual(
+                self.check(), "The domain name example.org does not exist."
+            )
+
+    def test_cached_per_domain(self):
+        with resolver({"MX": dns.resolver.NXDOMAIN}):
+            self.check("one@example.org")
+
+        resolve = mock.AsyncMock(side_effect=AssertionError("looked up"))
+        with mock.patch("dns.asyncresolver.Resolver.resolve", resolve):
+            self.assertIn("does not exist", self.check("two@example.org"))
+
+    def test_timeout(self):
+        async def slow(self, domain, rdtype):
+            await asyncio.sleep(5)
+
+        with override_settings(EMAIL_VALIDATION_TIMEOUT=0.01):
+            with mock.patch("dns.asyncresolver.Resolver.resolve", slow):
+                self.assertIsNone(self.check())
+
+    def test_no_nameservers(self):
+        with resolver({"MX": dns.resolver.NoNameservers}):
+            self.assertIsNone(self.check())
+
+    @override_settings(EMAIL_VALIDATION="offline")
+    def test_offline(self):
+        resolve = mock.AsyncMock(side_effect=AssertionError("looked up"))
+        with mock.patch("dns.asyncresolver.Resolver.resolve", resolve):
+            self.assertIsNone(self.check())
+
+
+@override_settings(EMAIL_VALIDATION="deliverability")
+class SignUpDeliverabilityTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_undeliverable(self):
+        user = UserFactory.build()
+        with resolver({"MX": dns.resolver.NXDOMAIN}):
+            res = self.client.post(
+                reverse("api-1.0.0:user_signup"),
+                {
+                    "email": "user@example.org",
+                    "first_name": user.first_name,
+                    "last_name": user.last_name,
+                    "password": "Some-Long-Password-1",
+                    "conf_password": "Some-Long-Password-1",
+                },
+                content_type="application/json",
+            )
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("email", res.json()["details"])
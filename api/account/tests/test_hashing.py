@@ -0,0 +1,140 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model, user_login_failed
+from django.contrib.auth.backends import BaseBackend
+from django.core.exceptions import PermissionDenied
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .. import hashing
+from ..factories import UserFactory
+from ..hashing import HashingBusy, HashingExecutor
+
+
+class HashingExecutorTest(SimpleTestCase):
+    def saturated(self):
+        executor = HashingExecutor(max_workers=1, max_queue=0)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=async_to_sync(executor.run), args=[block])
+        thread.start()
+        started.wait(5)
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        return executor
+
+    def test_run(self):
+        executor = HashingExecutor(max_workers=1, max_queue=0)
+        self.assertEqual(async_to_sync(executor.run)(sum, [1, 2]), 3)
+        self.assertEqual(executor.stats.completed, 1)
+        self.assertEqual(executor.pending, 0)
+
+    def test_busy(self):
+        executor = self.saturated()
+
+        with self.assertRaises(HashingBusy):
+            async_to_sync(executor.run)(sum, [1])
+        self.assertEqual(executor.stats.rejected, 1)
+
+        metrics = executor.render_metrics()
+        self.assertIn("hashing_running 1", metrics)
+        self.assertIn("hashing_queued 0", metrics)
+        self.assertIn("hashing_rejected_total 1", metrics)
+
+
+class DenyBackend(BaseBackend):
+    def authenticate(self, request, username=None, password=None):
+        raise PermissionDenied
+
+
+class EmailBackend(BaseBackend):
+    def authenticate(self, request, username=None, password=None):
+        if password == "backend":
+            return get_user_model()._default_manager.get(email=username)
+
+
+class TokenBackend(BaseBackend):
+    def authenticate(self, request, token=None):
+        raise AssertionError("not called without a token")
+
+
+class HashingAPITest(TestCase):
+    def setUp(self):
+        self.password = "parol123"
+        self.user = UserFactory.create(password=self.password)
+
+    def login(self, password):
+        return self.client.post(
+            reverse("api-1.0.0:user_login"),
+            {"email": self.user.email, "password": password},
+            content_type="application/json",
+        )
+
+    def test_login(self):
+        completed = hashing.executor().stats.completed
+
+        self.assertEqual(self.login(self.password).status_code, 200)
+        self.assertEqual(self.login("wrong").status_code, 401)
+        self.assertEqual(hashing.executor().stats.completed, completed + 2)
+
+    def test_login_busy(self):
+        executor = HashingExecutor(max_workers=1, max_queue=0)
+        executor.pending = 1
+
+        with mock.patch.object(hashing, "executor", return_value=executor):
+            res = self.login(self.password)
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res["Retry-After"], "1")
+
+    def test_rehash_outdated_password(self):
+        self.user.password = "sha1$salt$" + "0" * 40
+        with mock.patch.object(hashing, "check_password", return_value=True):
+            self.assertTrue(
+                async_to_sync(hashing.acheck_password)(self.user, self.password)
+            )
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("md5$"))
+        self.assertTrue(self.user.check_password(self.password))
+
+    def authenticate(self, password):
+        return async_to_sync(hashing.aauthenticate)(None, self.user.email, password)
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "account.tests.test_hashing.TokenBackend",
+            "django.contrib.auth.backends.ModelBackend",
+            "account.tests.test_hashing.EmailBackend",
+        ]
+    )
+    def test_authenticate_backends(self):
+        user = self.authenticate(self.password)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.backend, "django.contrib.auth.backends.ModelBackend")
+
+        user = self.authenticate("backend")
+        self.assertEqual(user.backend, "account.tests.test_hashing.EmailBackend")
+
+    @override_settings(
+        AUTHENTICATION_BACKENDS=[
+            "account.tests.test_hashing.DenyBackend",
+            "account.tests.test_hashing.EmailBackend",
+        ]
+    )
+    def test_authenticate_permission_denied(self):
+        failed = mock.Mock()
+        user_login_failed.connect(failed)
+        self.addCleanup(user_login_failed.disconnect, failed)
+
+        self.assertIsNone(self.authenticate("backend"))
+        failed.assert_called_once()
+        self.assertEqual(
+            failed.call_args.kwargs["credentials"], {"username": self.user.email}
+        )
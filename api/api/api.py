@@ -3,7 +3,11 @@ from ninja import NinjaAPI
 from ninja.errors import ValidationError
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
 
-api = NinjaAPI(csrf=True)
+from account.hashing import HashingBusy
+
+from .timing import TimedRouter
+
+api = NinjaAPI(csrf=True, default_router=TimedRouter())
 
 
 @api.post("/csrftoken")
@@ -28,3 +32,12 @@ def validation_errors(request, exc: ValidationError):
 
     msg = {"error": "Invalid input", "details": errors}
     return api.create_response(request, msg, status=400)
+
+
+@api.exception_handler(HashingBusy)
+def hashing_busy(request, exc: HashingBusy):
+    response = api.create_response(
+        request, {"error": "Too many password checks, retry shortly"}, status=503
+    )
+    response["Retry-After"] = "1"
+    return response
@@ -0,0 +1,20 @@
+from django.db.backends.sqlite3 import base
+
+from ...pool import PooledDatabaseWrapperMixin
+
+
+class PragmaDatabaseWrapper(base.DatabaseWrapper):
+    """Runs the "PRAGMAS" of the database settings on each new connection."""
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict.get("PRAGMAS", {}).items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, PragmaDatabaseWrapper):
+    @property
+    def pooled(self) -> bool:
+        # Django never closes in-memory databases, closing them drops the data.
+        return super().pooled and not self.is_in_memory_db()
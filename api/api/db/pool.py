@@ -0,0 +1,355 @@
+"""
+A process wide pool of DB-API connections, shared by the threads of a worker.
+
+Django keeps one connection per thread and, with CONN_MAX_AGE = 0, closes it
+at the end of every request. The async views run their queries in
+sync_to_async threads, so each request pays for a new connect. The backends
+in api.db.backends hand the connections back to this pool instead, and the
+next request, on whichever thread, reuses a warm one. The pool is enabled by
+a "POOL" entry of the database settings:
+
+    "POOL": {
+        "MAX_SIZE": 10,               # open connections, idle or in use
+        "TIMEOUT": 10,                # seconds to wait for one, then PoolTimeout
+        "MAX_LIFETIME": 1800,         # seconds before a connection is replaced
+        "HEALTH_CHECK_INTERVAL": 30,  # ping connections idle for longer
+    }
+"""
+
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Callable, Dict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import OperationalError
+
+DEFAULTS = {
+    "MAX_SIZE": 10,
+    "TIMEOUT": 10,
+    "MAX_LIFETIME": 1800,
+    "HEALTH_CHECK_INTERVAL": 30,
+}
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+@dataclass
+class PoolStats:
+    acquired: int = 0
+    created: int = 0
+    discarded: int = 0
+    timeouts: int = 0
+    waits: int = 0
+    wait_seconds: float = 0
+    connect_seconds: float = 0
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        params=None,
+        max_size=10,
+        timeout=10,
+        max_lifetime=1800,
+        health_check_interval=30,
+    ):
+        self.params = params
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+
+        self.condition = threading.Condition()
+        # (connection, released at), the most recently released last.
+        self.idle = deque()
+        # Opened at, by id() of the connections of the pool.
+        self.opened: Dict[int, float] = {}
+        # Open connections plus the ones being opened.
+        self.size = 0
+        self.closed = False
+        self.stats = PoolStats()
+
+    @property
+    def in_use(self) -> int:
+        return self.size - len(self.idle)
+
+    def acquire(self, create: Callable):
+        """
+        Returns an idle connection, or one made by `create` while the pool
+        is below MAX_SIZE. Otherwise waits for a release, up to TIMEOUT.
+        """
+        started = time.monotonic()
+
+        while True:
+            connection, stale = self._checkout(started)
+            if connection is None:
+                break
+            if not stale or self._ping(connection):
+                with self.condition:
+                    self.stats.acquired += 1
+                return connection
+            self.discard(connection)
+
+        try:
+            connection = create()
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+        with self.condition:
+            self.opened[id(connection)] = time.monotonic()
+            self.stats.created += 1
+            self.stats.acquired += 1
+            self.stats.connect_seconds += time.monotonic() - started
+        return connection
+
+    def _checkout(self, started):
+        """
+        Pops the warmest idle connection, with whether it needs a health
+        check, or returns (None, False) once a slot for a new one is taken.
+        """
+        expired = []
+        waited = False
+
+        try:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    while self.idle:
+                        connection, released_at = self.idle.pop()
+                        if now - self.opened[id(connection)] > self.max_lifetime:
+                            self._forget(connection)
+                            expired.append(connection)
+                            continue
+                        return connection, (
+                            now - released_at > self.health_check_interval
+                        )
+
+                    if self.size < self.max_size:
+                        self.size += 1
+                        return None, False
+
+                    remaining = started + self.timeout - now
+                    if remaining <= 0:
+                        self.stats.timeouts += 1
+                        raise PoolTimeout(
+                            f"No database connection available after {self.timeout}s "
+                            f"({self.max_size} in use)."
+                        )
+
+                    if not waited:
+                        waited = True
+                        self.stats.waits += 1
+                    self.condition.wait(remaining)
+                    self.stats.wait_seconds += time.monotonic() - now
+        finally:
+            for connection in expired:
+                self._close(connection)
+
+    def release(self, connection):
+        with self.condition:
+            if not self.closed and id(connection) in self.opened:
+                self.idle.append((connection, time.monotonic()))
+                self.condition.notify()
+                return
+
+        self.discard(connection)
+
+    def discard(self, connection):
+        """Closes a checked out connection that can't be reused."""
+        with self.condition:
+            if id(connection) in self.opened:
+                self._forget(connection)
+        self._close(connection)
+
+    def close(self):
+        """Closes the idle connections, the others are closed on release."""
+        with self.condition:
+            self.closed = True
+            idle = [connection for connection, _ in self.idle]
+            self.idle.clear()
+            for connection in idle:
+                self._forget(connection)
+
+        for connection in idle:
+            self._close(connection)
+
+    def _forget(self, connection):
+        del self.opened[id(connection)]
+        self.size -= 1
+        self.stats.discarded += 1
+        self.condition.notify()
+
+    @staticmethod
+    def _ping(connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def pool_options(options) -> dict:
+    unknown = set(options) - set(DEFAULTS)
+    if unknown:
+        raise ImproperlyConfigured(
+            f"Unknown POOL options: {', '.join(sorted(unknown))}."
+        )
+    return {name.lower(): value for name, value in {**DEFAULTS, **options}.items()}
+
+
+def get_pool(alias: str, params, options) -> ConnectionPool:
+    """
+    The pool of the database `alias`. It is replaced when the connection
+    parameters change, e.g. when the test runner switches to the test database.
+    """
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.params != params:
+            if pool is not None:
+                pool.close()
+            pool = _pools[alias] = ConnectionPool(params, **pool_options(options))
+        return pool
+
+
+def pools() -> Dict[str, ConnectionPool]:
+    with _pools_lock:
+        return dict(_pools)
+
+
+def release_connections():
+    """
+    Hands the pooled connections of the current thread back, e.g. before a
+    long wait that needs no database. The next query checks one out again.
+    """
+    from django.db import connections
+
+    for connection in connections.all(initialized_only=True):
+        if getattr(connection, "pooled", False) and not connection.in_atomic_block:
+            connection.close()
+
+
+def close_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Takes the connections of a DatabaseWrapper from the pool of its alias and
+    gives them back on close(). Without a POOL setting it changes nothing.
+    """
+
+    _pool = None
+    _reclaim = None
+
+    @property
+    def pooled(self) -> bool:
+        return bool(self.settings_dict.get("POOL"))
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+
+        pool = get_pool(self.alias, conn_params, self.settings_dict["POOL"])
+        connection = pool.acquire(partial(super().get_new_connection, conn_params))
+        self._pool = pool
+        # The wrapper of a thread that ends without closing it, e.g. with
+        # CONN_MAX_AGE under ASGI, would otherwise hold its slot forever.
+        self._reclaim = weakref.finalize(self, reclaim, pool, connection)
+        return connection
+
+    def _close(self):
+        pool, self._pool = self._pool, None
+        if self._reclaim is not None:
+            self._reclaim.detach()
+            self._reclaim = None
+        if pool is None or self.connection is None:
+            return super()._close()
+
+        # Closed inside atomic() or after an error: its state is unknown.
+        if self.in_atomic_block or (self.errors_occurred and not self.is_usable()):
+            pool.discard(self.connection)
+            return
+
+        reclaim(pool, self.connection)
+
+
+def reclaim(pool: ConnectionPool, connection):
+    """Rolls back what the connection left open and returns it to the pool."""
+    try:
+        connection.rollback()
+    except Exception:
+        pool.discard(connection)
+    else:
+        pool.release(connection)
+
+
+METRICS = [
+    ("db_pool_acquired_total", "acquired", "counter", "Connections checked out."),
+    ("db_pool_created_total", "created", "counter", "Connections opened."),
+    ("db_pool_discarded_total", "discarded", "counter", "Connections closed."),
+    ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out."),
+    ("db_pool_waits_total", "waits", "counter", "Checkouts that had to wait."),
+    (
+        "db_pool_wait_seconds_total",
+        "wait_seconds",
+        "counter",
+        "Time spent waiting for a free connection.",
+    ),
+    (
+        "db_pool_connect_seconds_total",
+        "connect_seconds",
+        "counter",
+        "Time spent opening connections.",
+    ),
+]
+
+
+def render_metrics() -> str:
+    """The stats of the pools in the Prometheus text format."""
+    lines = [
+        "# HELP db_pool_connections Open connections of the pool.",
+        "# TYPE db_pool_connections gauge",
+    ]
+    snapshots = []
+    for alias, pool in sorted(pools().items()):
+        with pool.condition:
+            snapshots.append((alias, pool.in_use, len(pool.idle), asdict(pool.stats)))
+
+    for alias, in_use, idle, _ in snapshots:
+        lines.append(f'db_pool_connections{{alias="{alias}",state="in_use"}} {in_use}')
+        lines.append(f'db_pool_connections{{alias="{alias}",state="idle"}} {idle}')
+
+    for name, attribute, kind, help in METRICS:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for alias, _, _, stats in snapshots:
+            lines.append(f'{name}{{alias="{alias}"}} {stats[attribute]}')
+
+    return "\n".join(lines) + "\n"
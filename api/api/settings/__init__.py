@@ -0,0 +1,20 @@
+"""
+The settings profile is picked by DJANGO_ENV: "dev" (the default) or "prod".
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DJANGO_ENV = os.environ.get("DJANGO_ENV", "dev")
+
+if DJANGO_ENV == "prod":
+    from .prod import *  # noqa: F401,F403
+elif DJANGO_ENV == "dev":
+    from .dev import *  # noqa: F401,F403
+else:
+    from django.core.exceptions import ImproperlyConfigured
+
+    raise ImproperlyConfigured(f'Unknown DJANGO_ENV "{DJANGO_ENV}", use dev or prod.')
@@ -0,0 +1,307 @@
+"""
+Django settings for api project, shared by the dev and prod profiles.
+
+Generated by 'django-admin startproject' using Django 5.0.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.0/ref/settings/
+"""
+
+from pathlib import Path
+import os
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get("SECRET_KEY")
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get("ALLOWED_HOSTS", "").split()
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "corsheaders",
+    "phonenumber_field",
+    "account",
+    "store",
+]
+
+MIDDLEWARE = [
+    "api.timing.TimingMiddleware",
+    "corsheaders.middleware.CorsMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.locale.LocaleMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "account.middleware.CachedAuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "api.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = "api.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+
+# The api.db.backends engines take their connections from a per process pool
+# (api/db/pool.py). With CONN_MAX_AGE = 0 every request hands its connection
+# back to the pool, a positive CONN_MAX_AGE also keeps it on its thread.
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 10))
+
+DATABASES = {
+    "default": {
+        "ENGINE": "api.db.backends.sqlite3",
+        "NAME": os.environ.get("DB_NAME", BASE_DIR / "db.sqlite3"),
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+        "CONN_HEALTH_CHECKS": True,
+        "POOL": DB_POOL_MAX_SIZE
+        and {
+            "MAX_SIZE": DB_POOL_MAX_SIZE,
+            "TIMEOUT": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+            "MAX_LIFETIME": int(os.environ.get("DB_POOL_MAX_LIFETIME", 1800)),
+            "HEALTH_CHECK_INTERVAL": int(
+                os.environ.get("DB_POOL_HEALTH_CHECK_INTERVAL", 30)
+            ),
+        },
+    }
+}
+
+if os.environ.get("DB_ENGINE") == "postgresql":
+    DATABASES["default"].update(
+        ENGINE="api.db.backends.postgresql",
+        NAME=os.environ.get("DB_NAME"),
+        USER=os.environ.get("DB_USER"),
+        PASSWORD=os.environ.get("DB_PASSWORD"),
+        HOST=os.environ.get("DB_HOST", "localhost"),
+        PORT=os.environ.get("DB_PORT", "5432"),
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+# Backend of the catalog cache (catalog version, counts, anonymous responses
+# and favorite maps): "locmem", "file", "database" or "redis". locmem is
+# private to each process, so it only fits a single-process server (runserver,
+# one uvicorn worker): other workers would not see the version bumps and keep
+# serving stale pages. prod defaults to "database", shared by all the workers;
+# its table is created by `manage.py createcachetable`.
+CATALOG_CACHE = os.environ.get("CATALOG_CACHE", "locmem")
+CATALOG_CACHE_MAX_ENTRIES = int(os.environ.get("CATALOG_CACHE_MAX_ENTRIES", 1000))
+# Backend of the session and user cache: "locmem", "database" or "redis".
+# Like the catalog cache, locmem only fits a single process: a logout or a
+# password change on one worker would leave the session and the user cached
+# on the others. prod defaults to "database", created by createcachetable.
+SESSION_CACHE = os.environ.get("SESSION_CACHE", "locmem")
+
+CATALOG_CACHES = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "catalog",
+        "OPTIONS": {"MAX_ENTRIES": CATALOG_CACHE_MAX_ENTRIES},
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", BASE_DIR / "cache"),
+        "OPTIONS": {"MAX_ENTRIES": CATALOG_CACHE_MAX_ENTRIES},
+    },
+    "database": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", "catalog_cache"),
+        "OPTIONS": {"MAX_ENTRIES": CATALOG_CACHE_MAX_ENTRIES},
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("CATALOG_CACHE_LOCATION", "redis://127.0.0.1:6379"),
+    },
+}
+
+SESSION_CACHES = {
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "sessions",
+    },
+    "database": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": os.environ.get("SESSION_CACHE_LOCATION", "session_cache"),
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get("SESSION_CACHE_LOCATION", "redis://127.0.0.1:6379"),
+    },
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "catalog": CATALOG_CACHES[CATALOG_CACHE],
+    "sessions": SESSION_CACHES[SESSION_CACHE],
+}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/5.0/topics/http/sessions/
+
+# Sessions are read from the "sessions" cache and written through to the
+# database. The cache also keeps the session users for USER_CACHE_TIMEOUT
+# seconds (account.middleware), so that authenticated reads don't query.
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "sessions"
+USER_CACHE_TIMEOUT = int(os.environ.get("USER_CACHE_TIMEOUT", 60))
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.0/topics/i18n/
+
+
+TIME_ZONE = "UTC"
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.0/howto/static-files/
+
+STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "static"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+MEDIA_ROOT = BASE_DIR / "media"
+MEDIA_URL = "/media/"
+
+INTERNAL_IPS = ["127.0.0.1", os.environ.get("HOST_IP_ADDRESS")]
+
+CORS_ALLOWED_ORIGINS = os.environ.get("CORS_ALLOWED_ORIGINS", "").split()
+CORS_ALLOW_CREDENTIALS = True
+
+CSRF_TRUSTED_ORIGINS = os.environ.get("CSRF_TRUSTED_ORIGINS", "").split()
+
+# CSRF_COOKIE_SECURE = True
+# SESSION_COOKIE_SECURE = True
+
+# CSRF_COOKIE_SAMESITE = "None"
+# SESSION_COOKIE_SAMESITE = "None"
+
+AUTH_USER_MODEL = "account.User"
+
+PHONENUMBER_DEFAULT_REGION = "AZ"
+
+import sys
+
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
+# Email validation (account.emails): "offline" checks the syntax only,
+# "deliverability" also looks the domain up in the DNS
+EMAIL_VALIDATION = os.environ.get("EMAIL_VALIDATION", "deliverability")
+EMAIL_VALIDATION_TIMEOUT = float(os.environ.get("EMAIL_VALIDATION_TIMEOUT", 2))
+EMAIL_DOMAIN_CACHE_TIMEOUT = int(os.environ.get("EMAIL_DOMAIN_CACHE_TIMEOUT", 3600))
+
+if TESTING:
+    PASSWORD_HASHERS = ("django.contrib.auth.hashers.MD5PasswordHasher",)
+    EMAIL_VALIDATION = "offline"
+
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.smtp.EmailBackend"
+)
+EMAIL_HOST = os.environ.get("EMAIL_HOST")
+EMAIL_PORT = os.environ.get("EMAIL_PORT")
+EMAIL_HOST_USER = os.environ.get("EMAIL_HOST_USER")
+EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_HOST_PASSWORD")
+EMAIL_USE_TLS = os.environ.get("EMAIL_USE_TLS")
+EMAIL_USE_SSL = os.environ.get("EMAIL_USE_SSL")
+EMAIL_TIMEOUT = os.environ.get("EMAIL_TIMEOUT")  # in seconds
+
+# Password hashing runs on a bounded thread pool (account.hashing), past
+# HASHING_MAX_QUEUE waiting calls the requests get a 503
+HASHING_MAX_WORKERS = int(os.environ.get("HASHING_MAX_WORKERS", os.cpu_count() or 1))
+HASHING_MAX_QUEUE = int(os.environ.get("HASHING_MAX_QUEUE", 32))
+# Nice value of the hashing threads (Linux), so requests get the CPU first
+HASHING_NICENESS = int(os.environ.get("HASHING_NICENESS", 10))
+
+# Share of the requests measured by api.timing (Server-Timing header, /metrics)
+TIMING_SAMPLE_RATE = float(os.environ.get("TIMING_SAMPLE_RATE", 1))
+# When set, /metrics requires an "Authorization: Bearer <token>" header.
+# Without a token /metrics is only served when METRICS_PUBLIC is on (off in
+# prod).
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+METRICS_PUBLIC = True
+
+# Emails are queued in the database and sent by `manage.py run_outbox`
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 8))
+OUTBOX_RETRY_DELAY = int(os.environ.get("OUTBOX_RETRY_DELAY", 30))  # in seconds
+
+
+from django.utils.translation import gettext_lazy as _
+
+LANGUAGE_CODE = "az"
+
+USE_I18N = True
+USE_L10N = True
+
+LOCALE_PATHS = [
+    BASE_DIR / "locale",
+]
+
+LANGUAGES = [("en", _("English")), ("az", _("Azerbaijani")), ("ru", _("Russian"))]
@@ -0,0 +1,57 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import CACHES, CATALOG_CACHES, DATABASES, SESSION_CACHES, TEMPLATES
+
+DEBUG = False
+
+DATABASES = {
+    "default": {
+        **DATABASES["default"],
+        # Persistent connections come from the pool: under ASGI every
+        # request runs on a thread of its own, so a CONN_MAX_AGE would only
+        # keep connections on threads that are gone. Raise it under WSGI.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 0)),
+        # Run on each new SQLite connection by api.db.backends.sqlite3. WAL
+        # lets readers go on while a write commits, NORMAL syncs at
+        # checkpoints only.
+        "PRAGMAS": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": int(os.environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+            "busy_timeout": int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),  # ms
+        },
+    }
+}
+
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        "APP_DIRS": False,
+        "OPTIONS": {
+            **TEMPLATES[0]["OPTIONS"],
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                )
+            ],
+        },
+    }
+]
+
+# The catalog version, the cached responses, the sessions and the session
+# users must be seen by every worker.
+CATALOG_CACHE = os.environ.get("CATALOG_CACHE", "database")
+SESSION_CACHE = os.environ.get("SESSION_CACHE", "database")
+CACHES = {
+    **CACHES,
+    "catalog": CATALOG_CACHES[CATALOG_CACHE],
+    "sessions": SESSION_CACHES[SESSION_CACHE],
+}
+
+# /metrics is denied unless METRICS_TOKEN is set.
+METRICS_PUBLIC = False
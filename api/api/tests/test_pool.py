@@ -0,0 +1,161 @@
+import gc
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from ..db.backends.sqlite3.base import DatabaseWrapper
+from ..db.pool import ConnectionPool, PoolTimeout, close_pools, render_metrics
+
+
+def connect():
+    return sqlite3.connect(":memory:", check_same_thread=False)
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def test_reuse(self):
+        pool = ConnectionPool(max_size=2)
+        connection = pool.acquire(connect)
+        pool.release(connection)
+
+        self.assertIs(pool.acquire(connect), connection)
+        self.assertEqual(pool.stats.created, 1)
+        self.assertEqual(pool.stats.acquired, 2)
+        self.assertEqual(pool.in_use, 1)
+
+    def test_timeout(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.acquire(connect)
+
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(connect)
+        self.assertEqual(pool.stats.timeouts, 1)
+        self.assertEqual(pool.stats.waits, 1)
+
+    def test_wait_for_release(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.acquire(connect)
+
+        timer = threading.Timer(0.05, pool.release, [connection])
+        timer.start()
+        self.assertIs(pool.acquire(connect), connection)
+        timer.join()
+
+        self.assertEqual(pool.stats.waits, 1)
+        self.assertGreater(pool.stats.wait_seconds, 0)
+
+    def test_health_check(self):
+        pool = ConnectionPool(max_size=1, health_check_interval=0)
+        broken = pool.acquire(connect)
+        pool.release(broken)
+        broken.close()
+
+        connection = pool.acquire(connect)
+        self.assertIsNot(connection, broken)
+        self.assertEqual(pool.stats.discarded, 1)
+        self.assertEqual(pool.size, 1)
+
+    def test_max_lifetime(self):
+        pool = ConnectionPool(max_size=1, max_lifetime=0)
+        old = pool.acquire(connect)
+        pool.release(old)
+        time.sleep(0.01)
+
+        self.assertIsNot(pool.acquire(connect), old)
+        self.assertEqual(pool.stats.discarded, 1)
+
+    def test_failed_connect_frees_the_slot(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+
+        def fail():
+            raise sqlite3.OperationalError("unable to open database file")
+
+        with self.assertRaises(sqlite3.OperationalError):
+            pool.acquire(fail)
+        self.assertEqual(pool.size, 0)
+        pool.acquire(connect)
+
+
+class PooledBackendTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(close_pools)
+
+        self.settings_dict = {
+            **connections.settings["default"],
+            "NAME": str(Path(directory.name) / "pool.sqlite3"),
+            "POOL": {"MAX_SIZE": 2},
+        }
+
+    def wrapper(self):
+        return DatabaseWrapper(self.settings_dict, alias="pool")
+
+    def raw_connection(self, wrapper):
+        wrapper.ensure_connection()
+        connection = wrapper.connection
+        wrapper.close()
+        return connection
+
+    def test_close_returns_the_connection(self):
+        first = self.raw_connection(self.wrapper())
+        self.assertIs(self.raw_connection(self.wrapper()), first)
+
+    def test_shared_between_threads(self):
+        first = self.raw_connection(self.wrapper())
+
+        connections = []
+        thread = threading.Thread(
+            target=lambda: connections.append(self.raw_connection(self.wrapper()))
+        )
+        thread.start()
+        thread.join()
+
+        self.assertEqual(connections, [first])
+
+    def test_rolls_back_before_release(self):
+        wrapper = self.wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute("CREATE TABLE t (id integer)")
+
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute("INSERT INTO t VALUES (1)")
+        wrapper.close()
+
+        wrapper = self.wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM t")
+            self.assertEqual(cursor.fetchone(), (0,))
+        wrapper.close()
+
+    def test_reclaimed_when_not_closed(self):
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        first = wrapper.connection
+        del wrapper
+        gc.collect()
+
+        self.assertIs(self.raw_connection(self.wrapper()), first)
+
+    def test_not_pooled(self):
+        self.settings_dict["POOL"] = None
+        first = self.raw_connection(self.wrapper())
+        self.assertIsNot(self.raw_connection(self.wrapper()), first)
+
+    def test_in_memory_not_pooled(self):
+        self.settings_dict["NAME"] = ":memory:"
+        self.assertFalse(self.wrapper().pooled)
+
+    def test_metrics(self):
+        self.raw_connection(self.wrapper())
+        self.raw_connection(self.wrapper())
+
+        rendered = render_metrics()
+        self.assertIn('db_pool_connections{alias="pool",state="idle"} 1', rendered)
+        self.assertIn('db_pool_acquired_total{alias="pool"} 2', rendered)
+        self.assertIn('db_pool_created_total{alias="pool"} 1', rendered)
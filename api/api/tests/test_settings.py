@@ -0,0 +1,47 @@
+import importlib
+import tempfile
+from pathlib import Path
+
+from django.db import connections
+from django.test import SimpleTestCase
+
+from ..db.backends.sqlite3.base import DatabaseWrapper
+
+
+class ProdSettingsTest(SimpleTestCase):
+    def setUp(self):
+        self.prod = importlib.import_module("api.settings.prod")
+
+    def test_profile(self):
+        self.assertFalse(self.prod.DEBUG)
+        self.assertNotIn("debug_toolbar", self.prod.INSTALLED_APPS)
+        self.assertNotIn(
+            "debug_toolbar.middleware.DebugToolbarMiddleware", self.prod.MIDDLEWARE
+        )
+        self.assertEqual(
+            self.prod.SESSION_ENGINE, "django.contrib.sessions.backends.cached_db"
+        )
+        [(loader, _)] = self.prod.TEMPLATES[0]["OPTIONS"]["loaders"]
+        self.assertEqual(loader, "django.template.loaders.cached.Loader")
+
+    def test_sqlite_pragmas(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        wrapper = DatabaseWrapper(
+            {
+                **connections.settings["default"],
+                "NAME": str(Path(directory.name) / "prod.sqlite3"),
+                "POOL": None,
+                "PRAGMAS": self.prod.DATABASES["default"]["PRAGMAS"],
+            }
+        )
+        self.addCleanup(wrapper.close)
+
+        with wrapper.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone(), ("wal",))
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone(), (1,))
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone(), (5000,))
@@ -0,0 +1,71 @@
+import re
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from store.factories import ProductFactory
+from store.caching import catalog_cache
+from ..timing import metrics
+
+
+class TimingMiddlewareTest(TestCase):
+    def setUp(self):
+        catalog_cache().clear()
+        metrics.reset()
+        ProductFactory.create_batch(3)
+
+    def server_timing(self, res):
+        return {
+            name: float(dur)
+            for name, dur in re.findall(
+                r"(\w+);(?:desc=\"[^\"]*\";)?dur=([\d.]+)", res["Server-Timing"]
+            )
+        }
+
+    def test_server_timing_header(self):
+        res = self.client.get(reverse("api-1.0.0:product_list"))
+        self.assertEqual(res.status_code, 200)
+
+        self.assertIn('db;desc="2 queries"', res["Server-Timing"])
+        timing = self.server_timing(res)
+        self.assertGreater(timing["handler"], 0)
+        self.assertGreater(timing["serialize"], 0)
+        self.assertGreaterEqual(
+            timing["total"], timing["handler"] + timing["serialize"]
+        )
+
+    def test_metrics(self):
+        self.client.get(reverse("api-1.0.0:product_list"))
+        self.client.get(reverse("api-1.0.0:product_list"), {"page": 2})
+
+        res = self.client.get(reverse("metrics"))
+        self.assertEqual(res.status_code, 200)
+        labels = 'operation="api-1.0.0:product_list",method="GET"'
+        self.assertIn(
+            f"http_request_duration_seconds_count{{{labels}}} 2", res.content.decode()
+        )
+        # The second page reuses the cached count.
+        self.assertIn(f"db_queries_total{{{labels}}} 3", res.content.decode())
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+        res = self.client.get(
+            reverse("metrics"), headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_PUBLIC=False)
+    def test_metrics_denied_by_default(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+
+    def test_metrics_not_public_in_prod(self):
+        from api.settings import prod
+
+        self.assertFalse(prod.METRICS_PUBLIC)
+
+    @override_settings(TIMING_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        res = self.client.get(reverse("api-1.0.0:product_list"))
+        self.assertEqual(res.status_code, 200)
+        self.assertFalse(res.has_header("Server-Timing"))
+        self.assertEqual(metrics.operations, {})
@@ -0,0 +1,286 @@
+"""
+Per-request timings: query count and time, handler time, serialization time
+and total time. They are sent back in a `Server-Timing` header and summed up
+per view (e.g. `api-1.0.0:product_list`) for the Prometheus `/metrics` view.
+
+Only a `TIMING_SAMPLE_RATE` share of the requests is measured. For the
+others the only work is one random() call and a context variable lookup
+per query.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from ninja import Router
+
+from account import hashing
+
+from .db import pool
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+@dataclass
+class RequestTimings:
+    start: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db: float = 0
+    handler: float = 0
+    handler_end: Optional[float] = None
+    serialization: float = 0
+
+    def server_timing(self, total: float) -> str:
+        return ", ".join(
+            [
+                f'db;desc="{self.queries} queries";dur={self.db * 1000:.2f}',
+                f"handler;dur={self.handler * 1000:.2f}",
+                f"serialize;dur={self.serialization * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("timings", default=None)
+
+
+def execute_wrapper(execute, sql, params, many, context):
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - start
+        timings.queries += 1
+
+
+def install(connection, **kwargs):
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+connection_created.connect(install, dispatch_uid="timing_execute_wrapper")
+
+
+@dataclass
+class OperationStats:
+    buckets: list = field(default_factory=lambda: [0] * len(BUCKETS))
+    count: int = 0
+    duration: float = 0
+    queries: int = 0
+    db: float = 0
+    handler: float = 0
+    serialization: float = 0
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.operations: Dict[Tuple[str, str], OperationStats] = {}
+
+    def observe(self, operation: str, method: str, timings: RequestTimings, total):
+        with self.lock:
+            stats = self.operations.setdefault((operation, method), OperationStats())
+            stats.count += 1
+            stats.duration += total
+            stats.queries += timings.queries
+            stats.db += timings.db
+            stats.handler += timings.handler
+            stats.serialization += timings.serialization
+            for i, bound in enumerate(BUCKETS):
+                if total <= bound:
+                    stats.buckets[i] += 1
+
+    def reset(self):
+        with self.lock:
+            self.operations.clear()
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Time spent serving the request.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        counters = [
+            ("db_queries_total", "queries", "Database queries executed."),
+            ("db_duration_seconds_total", "db", "Time spent in database queries."),
+            ("handler_duration_seconds_total", "handler", "Time spent in the view."),
+            (
+                "serialization_duration_seconds_total",
+                "serialization",
+                "Time spent validating and rendering the response.",
+            ),
+        ]
+
+        with self.lock:
+            operations = sorted(self.operations.items())
+
+            for (operation, method), stats in operations:
+                labels = f'operation="{operation}",method="{method}"'
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    lines.append(
+                        f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}'
+                )
+                lines.append(
+                    f"http_request_duration_seconds_sum{{{labels}}} {stats.duration}"
+                )
+                lines.append(
+                    f"http_request_duration_seconds_count{{{labels}}} {stats.count}"
+                )
+
+            for name, attribute, help in counters:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} counter")
+                for (operation, method), stats in operations:
+                    labels = f'operation="{operation}",method="{method}"'
+                    lines.append(f"{name}{{{labels}}} {getattr(stats, attribute)}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def _sampled() -> bool:
+    rate = getattr(settings, "TIMING_SAMPLE_RATE", 1)
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+class TimingMiddleware:
+    """Goes first in MIDDLEWARE, so that the total covers the other middleware."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+        # Connections opened before the first request missed connection_created.
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not _sampled():
+            return self.get_response(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request: HttpRequest):
+        if not _sampled():
+            return await self.get_response(request)
+
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        return self.finish(request, response, timings)
+
+    def finish(self, request: HttpRequest, response, timings: RequestTimings):
+        end = time.perf_counter()
+        total = end - timings.start
+        if timings.handler_end is not None:
+            # After a timed() view: validation, rendering and the response
+            # phase of the middleware below this one.
+            timings.serialization = end - timings.handler_end
+
+        response["Server-Timing"] = timings.server_timing(total)
+
+        match = request.resolver_match
+        operation = match.view_name if match else "unmatched"
+        metrics.observe(operation, request.method, timings, total)
+
+        return response
+
+
+def timed(view_func):
+    """
+    Times the view function itself. TimingMiddleware counts the rest of the
+    operation (response validation and rendering) as serialization.
+    """
+
+    def start():
+        return time.perf_counter() if _timings.get() is not None else None
+
+    def stop(started):
+        timings = _timings.get()
+        if started is not None and timings is not None:
+            timings.handler_end = time.perf_counter()
+            timings.handler += timings.handler_end - started
+
+    if asyncio.iscoroutinefunction(view_func):
+
+        @wraps(view_func)
+        async def wrapper(*args, **kwargs):
+            started = start()
+            try:
+                return await view_func(*args, **kwargs)
+            finally:
+                stop(started)
+
+    else:
+
+        @wraps(view_func)
+        def wrapper(*args, **kwargs):
+            started = start()
+            try:
+                return view_func(*args, **kwargs)
+            finally:
+                stop(started)
+
+    return wrapper
+
+
+class TimedRouter(Router):
+    """A Router whose operations split their time into handler and serialization."""
+
+    def add_api_operation(self, path, methods, view_func, **kwargs):
+        super().add_api_operation(path, methods, timed(view_func), **kwargs)
+
+
+def metrics_view(request: HttpRequest):
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if token:
+        allowed = constant_time_compare(
+            request.headers.get("Authorization", ""), f"Bearer {token}"
+        )
+    else:
+        allowed = getattr(settings, "METRICS_PUBLIC", False)
+
+    if not allowed:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        metrics.render() + pool.render_metrics() + hashing.executor().render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
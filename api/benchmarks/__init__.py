@@ -0,0 +1,146 @@
+"""
+Benchmarks run against a throwaway test database, so they never touch
+db.sqlite3. Run them from the `api` directory, e.g.:
+
+    python -m benchmarks.distinct --products 20000
+"""
+
+import os
+import random
+import statistics
+import time
+from decimal import Decimal
+
+
+def setup():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmarks")
+    # The test clients resolve the API urls a second time.
+    os.environ.setdefault("NINJA_SKIP_REGISTRY", "yes")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def measure(func, repeat=20):
+    """Calls `func` `repeat` times and returns p50/p95 latency in milliseconds."""
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return percentiles(timings)
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return {
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+    }
+
+
+def seed_catalog(products, brands, groups, groups_per_product=2, batch_size=2000):
+    """
+    Bulk-inserts a catalog built with the store factories. Names are drawn
+    per row because the factories evaluate theirs once at import time.
+    """
+    from factory.faker import faker
+    from store.factories import BrandFactory, GroupFactory, ProductFactory
+    from store.models import Brand, Group, Product
+
+    fake = faker.Faker()
+
+    Brand.objects.bulk_create(
+        (BrandFactory.build(name=fake.company()) for _ in range(brands)), batch_size
+    )
+    Group.objects.bulk_create(
+        (GroupFactory.build(name=fake.word()) for _ in range(groups)), batch_size
+    )
+    brand_list = list(Brand.objects.all())
+    group_ids = list(Group.objects.values_list("id", flat=True))
+
+    Product.objects.bulk_create(
+        (
+            ProductFactory.build(
+                brand=random.choice(brand_list),
+                name=" ".join(fake.words(2)).title(),
+                price_per_gram=Decimal(random.randint(100, 9999)) / 100,
+                sales=random.randint(0, 1000),
+            )
+            for _ in range(products)
+        ),
+        batch_size,
+    )
+
+    Membership = Product.groups.through
+    Membership.objects.bulk_create(
+        (
+            Membership(product_id=product_id, group_id=group_id)
+            for product_id in Product.objects.values_list("id", flat=True)
+            for group_id in random.sample(group_ids, groups_per_product)
+        ),
+        batch_size,
+    )
+
+
+def seed_orders(orders, users, items_per_order=3, batch_size=2000):
+    """
+    Bulk-inserts `users` users and `orders` orders spread evenly over them,
+    each with 1 to `items_per_order` items of random products. The password
+    is hashed once and shared, hashing it per user would dominate the run.
+    """
+    from account.factories import UserFactory
+    from account.models import User
+    from store.factories import OrderFactory
+    from store.models import Order, OrderItem, Product
+
+    template = UserFactory.build()
+    order_template = OrderFactory.build(user=template)
+    User.objects.bulk_create(
+        (
+            User(
+                email=f"customer{i}@gmail.com",
+                first_name=template.first_name,
+                last_name=template.last_name,
+                password=template.password,
+            )
+            for i in range(users)
+        ),
+        batch_size,
+    )
+    user_ids = list(User.objects.values_list("id", flat=True))
+    product_ids = list(Product.objects.values_list("id", flat=True))
+
+    for start in range(0, orders, batch_size):
+        batch = Order.objects.bulk_create(
+            Order(
+                user_id=user_ids[i % len(user_ids)],
+                email=f"customer{i % len(user_ids)}@gmail.com",
+                phone=order_template.phone,
+                address=order_template.address,
+                completed=random.random() < 0.8,
+            )
+            for i in range(start, min(start + batch_size, orders))
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order_id=order.id,
+                product_id=product_id,
+                size=random.choice(Product.SIZES),
+                quantity=random.randint(1, 3),
+            )
+            for order in batch
+            for product_id in random.sample(
+                product_ids, random.randint(1, items_per_order)
+            )
+        )
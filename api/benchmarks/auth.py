@@ -0,0 +1,92 @@
+"""
+Per-request overhead of authenticating a session cookie, with ninja's
+django_auth wrapped in sync_to_async() as the views used to do, and with
+the native async adjango_auth of account.helpers:
+
+    python -m benchmarks.auth --requests 5000
+
+Both run the CachedAuthenticationMiddleware first, against warm session
+and user caches, so the difference is the thread hop and the second
+request.auser() call.
+"""
+
+import argparse
+import asyncio
+import time
+
+from . import percentiles, setup
+
+
+async def legacy(request):
+    from asgiref.sync import sync_to_async
+    from ninja.security import django_auth
+
+    if await sync_to_async(django_auth)(request):
+        return await request.auser()
+
+
+async def native(request):
+    from account.helpers import adjango_auth
+
+    return await adjango_auth(request)
+
+
+async def run(flows, requests, build_request):
+    results = {}
+    for name, flow in flows.items():
+        for _ in range(100):
+            await flow(build_request())
+
+        timings = []
+        for _ in range(requests):
+            request = build_request()
+            start = time.perf_counter()
+            user = await flow(request)
+            timings.append((time.perf_counter() - start) * 1_000_000)
+            assert user.is_authenticated
+        results[name] = percentiles(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from django.test import Client, RequestFactory
+
+    from account.factories import UserFactory
+    from account.middleware import CachedAuthenticationMiddleware
+
+    client = Client()
+    client.force_login(UserFactory())
+    cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    factory = RequestFactory()
+    sessions = SessionMiddleware(lambda request: None)
+    authentication = CachedAuthenticationMiddleware(lambda request: None)
+
+    def build_request():
+        request = factory.get("/api/accounts/me")
+        request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+        sessions.process_request(request)
+        authentication.process_request(request)
+        return request
+
+    results = asyncio.run(
+        run(
+            {"sync_to_async": legacy, "native": native},
+            args.requests,
+            build_request,
+        )
+    )
+    for name, latency in results.items():
+        print(f"{name:<14} p50 {latency['p50']:>7.1f}us  p95 {latency['p95']:>7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Per-request connection overhead with and without the pool of api.db.pool.
+Each simulated request opens the connection, runs one query and closes it,
+as Django does with CONN_MAX_AGE = 0, from --threads threads at a time like
+the sync_to_async threads of the async views.
+
+    python -m benchmarks.connections --requests 2000 --threads 4
+
+It runs against a temporary SQLite file unless --alias names a database of
+the settings, e.g. a PostgreSQL one, where connecting costs far more.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from . import percentiles
+
+
+def request(wrapper):
+    wrapper.ensure_connection()
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    wrapper.close()
+
+
+def run(settings_dict, requests, threads):
+    from django.utils.module_loading import import_string
+
+    engine = settings_dict["ENGINE"]
+    wrapper_class = import_string(f"{engine}.base.DatabaseWrapper")
+    timings = []
+    lock = threading.Lock()
+
+    def worker(count):
+        wrapper = wrapper_class(settings_dict, alias="benchmark")
+        local = []
+        for _ in range(count):
+            start = time.perf_counter()
+            request(wrapper)
+            local.append((time.perf_counter() - start) * 1000)
+        with lock:
+            timings.extend(local)
+
+    workers = [
+        threading.Thread(target=worker, args=[requests // threads])
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, percentiles(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--alias", help="Benchmark this database of the settings.")
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api.settings")
+    os.environ.setdefault("SECRET_KEY", "benchmarks")
+
+    import django
+
+    django.setup()
+
+    from django.db import connections
+    from api.db.pool import close_pools, pools
+
+    directory = tempfile.TemporaryDirectory()
+    if args.alias:
+        base = dict(connections.settings[args.alias])
+    else:
+        base = {
+            **connections.settings["default"],
+            "ENGINE": "api.db.backends.sqlite3",
+            "NAME": str(Path(directory.name) / "benchmark.sqlite3"),
+        }
+
+    for label, pool in [
+        ("no pool", None),
+        ("pool", {"MAX_SIZE": args.pool_size}),
+    ]:
+        settings_dict = {**base, "POOL": pool}
+        elapsed, latency = run(settings_dict, args.requests, args.threads)
+        print(
+            f"{label:<8} {args.requests / elapsed:>9.0f} req/s  "
+            f"p50 {latency['p50']:.3f}ms  p95 {latency['p95']:.3f}ms"
+        )
+
+        if pool:
+            stats = pools()["benchmark"].stats
+            print(
+                f"         {stats.created} connects, {stats.waits} waits "
+                f"({stats.wait_seconds * 1000:.1f}ms)"
+            )
+        close_pools()
+
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares the product listing filtered by groups with the old blanket
+DISTINCT + M2M join against the `id IN (subquery)` rewrite in ProductFilter.
+
+    python -m benchmarks.distinct --products 20000
+"""
+
+import argparse
+
+from . import measure, seed_catalog, setup
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--brands", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+
+    from store.api import PAGE_SIZE
+    from store.filters import ProductFilter
+    from store.models import Group, Product
+
+    seed_catalog(args.products, args.brands, args.groups)
+    slugs = list(Group.objects.values_list("slug", flat=True)[:3])
+
+    queries = {
+        "distinct + join": (
+            Product.objects.all()
+            .distinct()
+            .with_favorite(None)
+            .filter(groups__slug__in=slugs)
+            .order_by("name")
+        ),
+        "id IN (subquery)": ProductFilter(groups=slugs)
+        .filter(Product.objects.all().with_favorite(None))
+        .order_by("name"),
+    }
+
+    for name, queryset in queries.items():
+        print(f"== {name}")
+        print(queryset[:PAGE_SIZE].explain())
+
+        count = measure(queryset.count, args.repeat)
+        page = measure(lambda: list(queryset[:PAGE_SIZE]), args.repeat)
+        print(f"count: p50 {count['p50']:.2f}ms p95 {count['p95']:.2f}ms")
+        print(f"page:  p50 {page['p50']:.2f}ms p95 {page['p95']:.2f}ms\n")
+
+
+if __name__ == "__main__":
+    main()
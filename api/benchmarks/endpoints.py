@@ -0,0 +1,254 @@
+"""
+Drives every API endpoint through ninja's test client against a seeded
+catalog and records, per endpoint, the number of queries, p50/p95 latency
+and the peak memory allocated while serving one request. The numbers are
+compared with the budget in endpoints.json and the run exits with status 1
+when an endpoint goes over it.
+
+    python -m benchmarks.endpoints            # check against the baseline
+    python -m benchmarks.endpoints --update   # record a new baseline
+
+Query counts are exact budgets. Latency and allocations vary between
+machines, so record the baseline where the check runs and allow for noise
+with --latency-tolerance and --memory-tolerance.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from . import percentiles, seed_catalog, seed_orders, setup
+
+BASELINE = Path(__file__).with_name("endpoints.json")
+
+
+class Endpoint:
+    def __init__(self, name, method, path, auth=False, json=None, cached=False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.auth = auth
+        self.json = json
+        # Catalog reads are served from the response cache once warm, the
+        # cold path is the one that hits the database.
+        self.cached = cached
+
+
+def endpoints(user):
+    from store.models import Group, Product
+
+    product = Product.objects.order_by("-sales").first()
+    groups = list(Group.objects.values_list("slug", flat=True)[:2])
+    word = product.name.split()[0].lower()
+    items = [
+        {"product_id": id, "size": 30, "quantity": 1}
+        for id in Product.objects.values_list("id", flat=True)[:3]
+    ]
+    detail = f"/products/{product.brand.slug}_{product.slug}"
+
+    return [
+        Endpoint("brand_list", "get", "/brands/"),
+        Endpoint("group_list", "get", "/groups/"),
+        Endpoint("product_list", "get", "/products/"),
+        Endpoint("product_list cached", "get", "/products/", cached=True),
+        Endpoint(
+            "product_list filtered",
+            "get",
+            "/products/?gender=F&season=SS&ordering=name&page=3",
+        ),
+        Endpoint(
+            "product_list groups",
+            "get",
+            "/products/?" + "&".join(f"groups={slug}" for slug in groups),
+        ),
+        Endpoint("product_list price", "get", "/products/?min_price=100&max_price=300"),
+        Endpoint("product_list search", "get", f"/products/?search={word}"),
+        Endpoint("product_list cursor", "get", "/products/?ordering=-sales&cursor="),
+        Endpoint("product_list facets", "get", "/products/?facets=true&gender=M"),
+        Endpoint("product_list favorites", "get", "/products/", auth=True),
+        Endpoint("product_detail", "get", detail),
+        Endpoint("group_list_of_product", "get", f"{detail}/groups"),
+        Endpoint("product_suggest", "get", f"/products/suggest?q={word[:3]}"),
+        Endpoint("favorite_list", "get", "/favorites/", auth=True),
+        Endpoint("order_list", "get", "/orders/", auth=True),
+        Endpoint(
+            "order_create",
+            "post",
+            "/orders/",
+            auth=True,
+            json={"phone": "+994504448899", "address": "Baki", "items": items},
+        ),
+        Endpoint("is_authenticated", "get", "/accounts/isauth", auth=True),
+        Endpoint("user_retrieve", "get", "/accounts/", auth=True),
+    ]
+
+
+def client_call(client, endpoint, user):
+    from asgiref.sync import async_to_sync
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+
+    current = user if endpoint.auth else AnonymousUser()
+
+    async def auser():
+        return current
+
+    params = {"user": current, "auser": auser}
+    if endpoint.auth:
+        params["COOKIES"] = {settings.SESSION_COOKIE_NAME: "benchmark"}
+    if endpoint.json is not None:
+        params["json"] = endpoint.json
+
+    # Run from a sync context, so that the ORM calls of the async views come
+    # back to this thread and its connection, where the queries are captured.
+    async def request():
+        return await getattr(client, endpoint.method)(endpoint.path, **params)
+
+    return async_to_sync(request)
+
+
+def run(endpoint, call, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from store.caching import CATALOG_VERSION_KEY, catalog_cache
+
+    def prepare():
+        if not endpoint.cached:
+            # Keep the version: the suggest index is rebuilt when it changes.
+            cache = catalog_cache()
+            version = cache.get(CATALOG_VERSION_KEY)
+            cache.clear()
+            cache.set(CATALOG_VERSION_KEY, version, None)
+
+    # Warm up the response cache and the connection.
+    response = call()
+    assert response.status_code < 400, (endpoint.name, response.status_code)
+
+    prepare()
+    with CaptureQueriesContext(connection) as queries:
+        call()
+
+    timings = []
+    for _ in range(repeat):
+        prepare()
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    prepare()
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latency = percentiles(timings)
+    return {
+        "queries": len(queries),
+        "p50": round(latency["p50"], 3),
+        "p95": round(latency["p95"], 3),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def regressions(results, baseline, latency_tolerance, memory_tolerance):
+    for name, result in results.items():
+        budget = baseline.get(name)
+        if budget is None:
+            continue
+
+        if result["queries"] > budget["queries"]:
+            yield f"{name}: {result['queries']} queries, budget {budget['queries']}"
+
+        for key, tolerance in [
+            ("p95", latency_tolerance),
+            ("peak_kb", memory_tolerance),
+        ]:
+            limit = budget[key] * (1 + tolerance)
+            if result[key] > limit:
+                yield f"{name}: {key} {result[key]}, budget {limit:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--brands", type=int, default=1000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", nargs="*", help="Only run these endpoints.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update", action="store_true")
+    parser.add_argument("--latency-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    setup()
+
+    from api.api import api
+    from account.models import User
+    from ninja.testing import TestAsyncClient
+    from store.models import Favorite, Product
+
+    from store.indexes import build_indexes
+
+    random.seed(0)
+    seed_catalog(args.products, args.brands, args.groups)
+    seed_orders(args.orders, args.users)
+    # As the ASGI and WSGI entry points do at startup, the seeding bypasses
+    # the signals that would keep the indexes current.
+    build_indexes()
+
+    user = User.objects.first()
+    Favorite.objects.bulk_create(
+        Favorite(user=user, product_id=id)
+        for id in Product.objects.values_list("id", flat=True)[:50]
+    )
+
+    client = TestAsyncClient(api)
+    results = {}
+
+    for endpoint in endpoints(user):
+        if args.only and endpoint.name not in args.only:
+            continue
+
+        result = run(endpoint, client_call(client, endpoint, user), args.repeat)
+        results[endpoint.name] = result
+        print(
+            f"{endpoint.name:<28} {result['queries']:>3} queries  "
+            f"p50 {result['p50']:>8.2f}ms  p95 {result['p95']:>8.2f}ms  "
+            f"peak {result['peak_kb']:>9.1f}KB"
+        )
+
+    if args.update:
+        baseline = (
+            json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        )
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        sys.exit(f"No baseline at {args.baseline}, record one with --update")
+
+    failures = list(
+        regressions(
+            results,
+            json.loads(args.baseline.read_text()),
+            args.latency_tolerance,
+            args.memory_tolerance,
+        )
+    )
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Catalog latency during a login storm. Serves a seeded temporary database
+with uvicorn (prod profile, real PBKDF2 hashing), measures the catalog
+endpoints alone, then again while --storm clients keep logging in:
+
+    python -m benchmarks.login_storm --storm 32 --workers 2
+
+With the hashing on the bounded executor of account.hashing the catalog
+p95 stays close to its baseline; the logins over capacity get a 503.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+from .profiles import free_port, load, seed, serve
+
+PASSWORD = "storm-password"
+
+
+def seed_users(users):
+    from account.models import User
+    from django.contrib.auth.hashers import make_password
+    from django.db import connections
+
+    password = make_password(PASSWORD)
+    User.objects.bulk_create(
+        User(
+            email=f"storm{i}@example.com",
+            first_name="Storm",
+            last_name="User",
+            password=password,
+        )
+        for i in range(users)
+    )
+    connections.close_all()
+
+
+def storm(port, users, stop, statuses, lock):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+
+    connection.request("POST", "/api/csrftoken")
+    response = connection.getresponse()
+    response.read()
+    token = response.headers["Set-Cookie"].split("csrftoken=")[1].split(";")[0]
+
+    while not stop.is_set():
+        body = json.dumps(
+            {
+                "email": f"storm{random.randrange(users)}@example.com",
+                "password": PASSWORD,
+            }
+        )
+        connection.request(
+            "POST",
+            "/api/accounts/login/",
+            body=body,
+            headers={
+                "Content-Type": "application/json",
+                "Cookie": f"csrftoken={token}",
+                "X-CSRFToken": token,
+            },
+        )
+        response = connection.getresponse()
+        response.read()
+        with lock:
+            statuses[response.status] += 1
+
+        if response.status == 503:
+            stop.wait(float(response.headers.get("Retry-After", 1)))
+
+    connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--brands", type=int, default=200)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--storm", type=int, default=32, help="Login clients.")
+    parser.add_argument("--workers", type=int, default=2, help="Hashing threads.")
+    parser.add_argument("--queue", type=int, default=8, help="Hashing queue.")
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    env = {
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmarks"),
+        "DB_NAME": str(Path(directory.name) / "storm.sqlite3"),
+        "ALLOWED_HOSTS": "127.0.0.1 localhost",
+        "TIMING_SAMPLE_RATE": "0",
+        "DJANGO_ENV": "prod",
+        "HASHING_MAX_WORKERS": str(args.workers),
+        "HASHING_MAX_QUEUE": str(args.queue),
+    }
+    random.seed(0)
+    seed(env, args.products, args.brands, args.groups)
+    seed_users(args.users)
+
+    port = free_port()
+    server = serve(env, port)
+    try:
+        load(port, args.concurrency * 5, args.concurrency, args.products)
+        results = {
+            "baseline": load(port, args.requests, args.concurrency, args.products)
+        }
+
+        stop = threading.Event()
+        statuses = Counter()
+        lock = threading.Lock()
+        clients = [
+            threading.Thread(
+                target=storm, args=[port, args.users, stop, statuses, lock]
+            )
+            for _ in range(args.storm)
+        ]
+        for client in clients:
+            client.start()
+        try:
+            results["login storm"] = load(
+                port, args.requests, args.concurrency, args.products
+            )
+        finally:
+            stop.set()
+            for client in clients:
+                client.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    for name, (rate, latency, errors) in results.items():
+        print(
+            f"{name:<12} {rate:>8.0f} req/s  p50 {latency['p50']:>7.2f}ms  "
+            f"p95 {latency['p95']:>7.2f}ms  {errors} errors"
+        )
+    print(
+        "logins: "
+        + ", ".join(f"{count} x {status}" for status, count in sorted(statuses.items()))
+    )
+
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
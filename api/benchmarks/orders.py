@@ -0,0 +1,110 @@
+"""
+Submits orders concurrently through the old multi-round-trip view code and
+through OrderService.create, and reports the per-order latency and the
+throughput of each.
+
+    python -m benchmarks.orders --orders 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from . import percentiles, seed_catalog, setup
+
+
+async def legacy_create(user, details):
+    from asgiref.sync import sync_to_async
+    from store.models import Order, OrderItem, Product
+    from store.signals import order_created
+
+    product_ids = [item.product_id for item in details.items]
+    if await Product.objects.filter(id__in=product_ids).acount() != len(
+        set(product_ids)
+    ):
+        return None
+
+    order = await Order.objects.acreate(
+        user=user,
+        email=user.email,
+        phone=details.phone,
+        address=details.address,
+        commentary=details.commentary,
+    )
+    await OrderItem.objects.abulk_create(
+        OrderItem(
+            order=order,
+            product_id=item.product_id,
+            size=item.size,
+            quantity=item.quantity,
+        )
+        for item in details.items
+    )
+    await sync_to_async(order_created.send)(Order, order=order)
+
+    return await Order.objects.prefetch_def(user).with_totals().aget(id=order.id)
+
+
+async def service_create(user, details):
+    from asgiref.sync import sync_to_async
+    from store.services import OrderService
+
+    return await sync_to_async(OrderService(user).create)(details)
+
+
+async def submit(create, users, product_ids, orders, concurrency):
+    from store.schemas import OrderInSchema, OrderOutSchema
+
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one():
+        details = OrderInSchema(
+            phone="+994504448899",
+            address="Baki seheri",
+            items=[
+                {"product_id": id, "size": random.choice([15, 30, 50]), "quantity": 1}
+                for id in random.sample(product_ids, 3)
+            ],
+        )
+        async with semaphore:
+            start = time.perf_counter()
+            order = await create(random.choice(users), details)
+            OrderOutSchema.from_orm(order).model_dump()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(orders)))
+    return timings, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+
+    from account.factories import UserFactory
+    from store.models import Product
+
+    seed_catalog(args.products, brands=50, groups=10)
+    users = UserFactory.create_batch(20)
+    product_ids = list(Product.objects.values_list("id", flat=True))
+
+    for name, create in [("legacy", legacy_create), ("OrderService", service_create)]:
+        timings, elapsed = asyncio.run(
+            submit(create, users, product_ids, args.orders, args.concurrency)
+        )
+        latency = percentiles(timings)
+        print(
+            f"{name:>12}: p50 {latency['p50']:.2f}ms p95 {latency['p95']:.2f}ms "
+            f"{args.orders / elapsed:.0f} orders/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
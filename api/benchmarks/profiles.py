@@ -0,0 +1,172 @@
+"""
+Load test of the dev and prod settings profiles. Seeds a temporary SQLite
+database, serves it with uvicorn under each profile in turn and drives the
+catalog endpoints from --concurrency keep-alive connections:
+
+    python -m benchmarks.profiles --requests 3000 --concurrency 16
+
+The dev profile runs with DEBUG (every query is kept in memory) and the
+debug toolbar, the prod one with persistent connections, cached templates
+and sessions and the SQLite pragmas.
+"""
+
+import argparse
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from . import percentiles, seed_catalog
+
+API_DIR = Path(__file__).resolve().parent.parent
+
+
+def seed(env, products, brands, groups):
+    os.environ.update(env)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api.settings")
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connections
+
+    call_command("migrate", verbosity=0)
+    seed_catalog(products, brands, groups)
+    connections.close_all()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(env, port):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "api.asgi:application",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=API_DIR,
+        env={**os.environ, **env},
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+def paths(products):
+    pages = max(1, products // 20)
+    return [
+        lambda: "/api/products/",
+        lambda: f"/api/products/?page={random.randint(1, pages)}",
+        lambda: "/api/products/?gender=F&season=SS&ordering=name",
+        lambda: f"/api/products/?ordering=-sales&page={random.randint(1, 10)}",
+        lambda: "/api/brands/",
+        lambda: "/api/groups/",
+    ]
+
+
+def load(port, requests, concurrency, products):
+    timings = []
+    errors = 0
+    lock = threading.Lock()
+    choices = paths(products)
+
+    def worker(count):
+        nonlocal errors
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = []
+        failed = 0
+
+        for _ in range(count):
+            start = time.perf_counter()
+            connection.request("GET", random.choice(choices)())
+            response = connection.getresponse()
+            response.read()
+            local.append((time.perf_counter() - start) * 1000)
+            failed += response.status >= 400
+
+        connection.close()
+        with lock:
+            timings.extend(local)
+            errors += failed
+
+    threads = [
+        threading.Thread(target=worker, args=[requests // concurrency])
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    return len(timings) / elapsed, percentiles(timings), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--brands", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--profiles", nargs="*", default=["dev", "prod"])
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+    env = {
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmarks"),
+        "DB_NAME": str(Path(directory.name) / "load.sqlite3"),
+        "ALLOWED_HOSTS": "127.0.0.1 localhost",
+        "TIMING_SAMPLE_RATE": "0",
+    }
+    random.seed(0)
+    seed(env, args.products, args.brands, args.groups)
+
+    for profile in args.profiles:
+        port = free_port()
+        server = serve({**env, "DJANGO_ENV": profile}, port)
+        try:
+            load(port, args.concurrency * 5, args.concurrency, args.products)
+            rate, latency, errors = load(
+                port, args.requests, args.concurrency, args.products
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(
+            f"{profile:<5} {rate:>8.0f} req/s  p50 {latency['p50']:>7.2f}ms  "
+            f"p95 {latency['p95']:>7.2f}ms  {errors} errors"
+        )
+
+    directory.cleanup()
+
+
+if __name__ == "__main__":
+    main()
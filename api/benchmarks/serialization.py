@@ -0,0 +1,61 @@
+"""
+Serialization of a 1,000-product page, rendered by ninja's JSONRenderer:
+model instances through ProductOutSchema, as the list endpoints used to do,
+against the values() rows of store.serializers, in full and with the fields
+a mobile client asks for (?fields=).
+
+    python -m benchmarks.serialization --rows 1000
+"""
+
+import argparse
+
+from . import measure, seed_catalog, setup
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    seed_catalog(args.rows, brands=50, groups=10)
+
+    from ninja.renderers import JSONRenderer
+
+    from store import serializers
+    from store.models import Product
+    from store.schemas import ProductOutSchema
+
+    products = Product.objects.order_by("id")[: args.rows]
+    renderer = JSONRenderer()
+
+    def schema():
+        data = [
+            ProductOutSchema.from_orm(product).model_dump()
+            for product in products.with_favorite()
+        ]
+        return renderer.render(None, data, response_status=200)
+
+    def values(fields=None):
+        def run():
+            rows = products.payload(fields)
+            data = serializers.products(rows, fields)
+            return renderer.render(None, data, response_status=200)
+
+        return run
+
+    for name, run in [
+        ("schema", schema),
+        ("values", values()),
+        ("sparse fields", values({"id", "display_name", "prices", "favorite_id"})),
+    ]:
+        latency = measure(run, args.repeat)
+        print(
+            f"{name:<16} p50 {latency['p50']:>7.2f}ms  p95 {latency['p95']:>7.2f}ms"
+            f"  {len(run())} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Brand, Group, OrderItem, Product, Order
+from .models import Brand, EmailOutbox, Group, OrderItem, Product, Order
 
 
 @admin.register(Brand)
@@ -15,7 +15,15 @@ class GroupAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ["name", "brand", "price_per_gram", "gender", "sales"]
+    list_display = [
+        "name",
+        "brand",
+        "price_per_gram",
+        "gender",
+        "sales",
+        "sales_7d",
+        "sales_30d",
+    ]
     prepopulated_fields = {"slug": ("name",)}
 
 
@@ -26,11 +34,23 @@ class OrderItemInline(admin.TabularInline):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ["user", "phone", "address", "completed", "ordered_at", "price"]
+    list_select_related = ["user"]
     actions = ["complete_order"]
     inlines = [OrderItemInline]
 
-    # @sync_to_async
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals()
+
+    @admin.display(description="Qiymət", ordering="total_price")
+    def price(self, obj):
+        return obj.price
+
     @admin.action(description="Sifarişi tamamla")
     def complete_order(modeladmin, request, queryset):
-        for obj in queryset:
-            obj.complete()
+        queryset.complete()
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipients", "attempts", "created_at", "sent_at"]
+    list_filter = [("sent_at", admin.EmptyFieldListFilter)]
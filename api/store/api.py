@@ -1,25 +1,43 @@
+import json
 from enum import Enum
-from typing import List
+from typing import FrozenSet, List, Optional
+from asgiref.sync import sync_to_async
 from django.http import Http404, HttpRequest
-from ninja import Query, Router
+from ninja import Query
+from ninja.decorators import decorate_view
 
 from account.helpers import adjango_auth
+from api.timing import TimedRouter
 
-from .models import Brand, Favorite, Group, Order, OrderItem, Product
+from . import serializers
+from .models import Brand, Favorite, Group, Order, Product
 from .schemas import *
+from .caching import acatalog_version, cache_response
+from .counting import CountMode, product_count
+from .facets import count_facets
 from .filters import ProductFilter
-from .signals import order_created
+from .pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_paginate,
+    ordering_keys,
+)
+from .services import OrderService, UnknownProduct
+from .suggest import index as suggest_index
 
-router = Router()
+router = TimedRouter()
 
 
 @router.get("/brands/", response=List[BrandOutSchema])
+@decorate_view(cache_response)
 async def brand_list(request: HttpRequest):
     brands = [brand async for brand in Brand.objects.all()]
     return brands
 
 
 @router.get("/groups/", response=List[GroupOutSchema])
+@decorate_view(cache_response)
 async def group_list(request: HttpRequest):
     groups = [group async for group in Group.objects.all()]
     return groups
@@ -31,17 +49,42 @@ class OrderChoices(Enum):
     PRICE_PER_GRAM_ASC = "price_per_gram"
     PRICE_PER_GRAM_DESC = "-price_per_gram"
     SALES = "-sales"
+    SALES_7D = "-sales_7d"
+    SALES_30D = "-sales_30d"
+    PRICE_ASC = "price_15"
+    PRICE_DESC = "-price_15"
 
 
 PAGE_SIZE = 8
 
 
+async def overlay_favorites(request: HttpRequest, user, content: bytes):
+    """Fills `favorite_id` of the shared product payload from the user's favorites."""
+    from api.api import api
+
+    favorites = await Favorite.objects.aproduct_map(user)
+    payload = json.loads(content)
+    products = payload["data"] if "data" in payload else [payload]
+
+    for product in products:
+        # Not there when ?fields= leaves it out.
+        if "favorite_id" in product:
+            product["favorite_id"] = favorites.get(product["id"])
+
+    return api.renderer.render(request, payload, response_status=200)
+
+
 @router.get("/products/", response={200: ProductListOutSchema, 422: None})
+@decorate_view(cache_response(overlay=overlay_favorites))
 async def product_list(
     request: HttpRequest,
     filters: ProductFilter = Query(...),
+    fields: ProductFieldsSchema = Query(...),
     ordering: OrderChoices = None,
     page: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count_mode: CountMode = CountMode.EXACT,
+    facets: bool = False,
 ):
     if page is None:
         page = 1
@@ -49,43 +92,117 @@ async def product_list(
     if page < 1:
         return 422, {"data": [], "count": 0, "next": 1, "previous": 0}
 
-    user = await request.auser()
-    products = Product.objects.all().distinct().with_favorite(user)  # type: ignore
-
-    products = filters.filter(products)
+    if cursor:
+        # Rejected before the count and facets are paid for.
+        try:
+            decode_cursor(cursor, ordering.value if ordering else None, Product)
+        except InvalidCursor:
+            return 422, {"data": [], "count": 0, "next": None, "previous": None}
+
+    # favorite_id is filled per user by overlay_favorites, the page itself is shared.
+    products = filters.filter(Product.objects.all())
+    count = await product_count(products, filters, count_mode)
+    facet_counts = await count_facets(filters) if facets else None
+
+    if cursor is not None:
+        return await _product_list_keyset(
+            request, products, fields.selected, ordering, cursor, count, facet_counts
+        )
 
     if ordering is not None:
         products = products.order_by(ordering.value)
 
     offset = (page - 1) * PAGE_SIZE
-    count = await products.acount()
-    products = products[offset : offset + PAGE_SIZE]
-    products = [product async for product in products]
+    rows = products.payload(fields.selected)[offset : offset + PAGE_SIZE + 1]
+    rows = [row async for row in rows]
+    has_more = len(rows) > PAGE_SIZE
+
+    return serializers.json_response(
+        request,
+        {
+            "data": serializers.products(rows[:PAGE_SIZE], fields.selected),
+            "count": count,
+            "next": page + 1 if has_more else None,
+            "previous": page - 1 if page - 1 > 0 else None,
+            "has_more": has_more,
+            "facets": facet_counts,
+            "next_cursor": None,
+        },
+    )
+
+
+async def _product_list_keyset(
+    request: HttpRequest,
+    products,
+    fields: Optional[FrozenSet[str]],
+    ordering: Optional[OrderChoices],
+    cursor: str,
+    count: Optional[int],
+    facet_counts: Optional[dict],
+):
+    ordering_value = ordering.value if ordering is not None else None
+
+    try:
+        page_qs = keyset_paginate(products, ordering_value, cursor)
+    except InvalidCursor:
+        return 422, {"data": [], "count": 0, "next": None, "previous": None}
+
+    # The cursor needs the ordering columns, e.g. sales, besides the payload.
+    keys = [key.lstrip("-") for key in ordering_keys(ordering_value)]
+    page_qs = page_qs.payload(fields, *keys)
+    rows = [row async for row in page_qs[: PAGE_SIZE + 1]]
+    has_more = len(rows) > PAGE_SIZE
+
+    return serializers.json_response(
+        request,
+        {
+            "data": serializers.products(rows[:PAGE_SIZE], fields),
+            "count": count,
+            "next": None,
+            "previous": None,
+            "has_more": has_more,
+            "facets": facet_counts,
+            "next_cursor": (
+                encode_cursor(rows[PAGE_SIZE - 1], ordering_value) if has_more else None
+            ),
+        },
+    )
+
+
+SUGGEST_MAX_LIMIT = 20
+
 
-    return {
-        "data": products,
-        "count": count,
-        "next": page + 1 if page * PAGE_SIZE < count else None,
-        "previous": page - 1 if page - 1 > 0 else None,
-    }
+@router.get("/products/suggest", response={200: List[SuggestionOutSchema], 503: None})
+async def product_suggest(request: HttpRequest, q: str, limit: int = 8):
+    # Built at startup by store.indexes.build_indexes(), and again here once
+    # another worker changed the catalog or the last build failed.
+    version = await acatalog_version()
+    if not suggest_index.is_current(version):
+        if not await sync_to_async(suggest_index.refresh)(version):
+            return 503, None
+
+    return suggest_index.suggest(q, max(1, min(limit, SUGGEST_MAX_LIMIT)))
 
 
 @router.get("/products/{brand_slug}_{product_slug}", response=ProductOutSchema)
-async def product_detail(request: HttpRequest, brand_slug: str, product_slug: str):
-    user = await request.auser()
-
-    product = (
-        await (
-            Product.objects.filter(brand__slug=brand_slug, slug=product_slug)
-            # .prefetch_related("groups")
-            .with_favorite(user).afirst()  # type: ignore
-        )
+@decorate_view(cache_response(overlay=overlay_favorites))
+async def product_detail(
+    request: HttpRequest,
+    brand_slug: str,
+    product_slug: str,
+    fields: ProductFieldsSchema = Query(...),
+):
+    row = await (
+        Product.objects.filter(brand__slug=brand_slug, slug=product_slug)
+        .payload(fields.selected)
+        .afirst()
     )
 
-    if product is None:
+    if row is None:
         raise Http404
 
-    return product
+    serialize = serializers.product_serializer(fields=fields.selected)
+    return serializers.json_response(request, serialize(row))
 
 
 @router.get(
@@ -105,21 +222,13 @@ async def group_list_of_product(
 
 
 @router.get("/favorites/", auth=adjango_auth, response=List[FavoriteOutSchema])
-async def favorite_list(request: HttpRequest):
-    user = await request.auser()
-    favorites = (
-        Favorite.objects.select_related("product", "product__brand")
-        .filter(user=user)
-        .all()
-    )
-
-    output = []
-
-    async for favorite in favorites:
-        favorite.product.favorite_id = favorite.id
-        output.append(favorite)
+async def favorite_list(request: HttpRequest, fields: ProductFieldsSchema = Query(...)):
+    user = request.auth
+    favorites = Favorite.objects.filter(user=user)
 
-    return output
+    return serializers.json_response(
+        request, await serializers.afavorites(favorites, fields.selected)
+    )
 
 
 @router.post(
@@ -133,7 +242,7 @@ async def favorite_create(request: HttpRequest, details: FavoriteInSchema):
     if product is None:
         return 422, None
 
-    user = await request.auser()
+    user = request.auth
 
     if await user.favorites.filter(product=product).aexists():
         return 409, None
@@ -147,7 +256,7 @@ async def favorite_create(request: HttpRequest, details: FavoriteInSchema):
     "/favorites/{favorite_id}/", auth=adjango_auth, response={204: None, 404: None}
 )
 async def favorite_destroy(request: HttpRequest, favorite_id: int):
-    user = await request.auser()
+    user = request.auth
     favorite = await Favorite.objects.filter(id=favorite_id, user=user).afirst()
 
     if favorite is None:
@@ -159,44 +268,23 @@ async def favorite_destroy(request: HttpRequest, favorite_id: int):
 
 
 @router.get("/orders/", auth=adjango_auth, response=List[OrderOutSchema])
-async def order_list(request: HttpRequest):
-    user = await request.auser()
-    orders = Order.objects.filter(user=user).prefetch_def(user).order_by("-ordered_at")
+async def order_list(request: HttpRequest, fields: ProductFieldsSchema = Query(...)):
+    user = request.auth
+    orders = Order.objects.filter(user=user).with_totals().order_by("-ordered_at")
+    favorites = await Favorite.objects.aproduct_map(user)
 
-    return [order async for order in orders]
+    return serializers.json_response(
+        request, await serializers.aorders(orders, favorites, fields.selected)
+    )
 
 
 @router.post("/orders/", auth=adjango_auth, response={201: OrderOutSchema, 422: None})
 async def order_create(request: HttpRequest, order_details: OrderInSchema):
-    user = await request.auser()
+    user = request.auth
 
-    product_ids = list(map(lambda item: item.product_id, order_details.items))
-
-    if await Product.objects.filter(id__in=product_ids).acount() != len(
-        set(product_ids)
-    ):
+    try:
+        order = await sync_to_async(OrderService(user).create)(order_details)
+    except UnknownProduct:
         return 422, None
 
-    order = await Order.objects.acreate(
-        user=user,
-        email=user.email,
-        phone=order_details.phone,
-        address=order_details.address,
-        commentary=order_details.commentary,
-    )
-
-    items = []
-    for item in order_details.items:
-        items.append(
-            OrderItem(
-                order=order,
-                product_id=item.product_id,
-                size=item.size,
-                quantity=item.quantity,
-            )
-        )
-
-    await OrderItem.objects.abulk_create(items)
-    order_created.send(Order, order=order)  # email
-
-    return 201, await Order.objects.prefetch_def(user).aget(id=order.id)
+    return 201, order
@@ -1,5 +1,6 @@
 from django.apps import AppConfig
-from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
 
 
 class StoreConfig(AppConfig):
@@ -7,14 +8,72 @@ class StoreConfig(AppConfig):
     name = "store"
 
     def ready(self):
-        if settings.TESTING:
-            return
-
         from . import signals
-        from .models import Order
+        from .models import Brand, Favorite, Group, Order, Product
+
+        for model in (Product, Brand, Group):
+            for signal in (post_save, post_delete):
+                signal.connect(
+                    receiver=signals.invalidate_catalog_receiver,
+                    sender=model,
+                    dispatch_uid=f"invalidate_catalog_{model.__name__}",
+                )
+
+        m2m_changed.connect(
+            receiver=signals.invalidate_catalog_receiver,
+            sender=Product.groups.through,
+            dispatch_uid="invalidate_catalog_groups",
+        )
+
+        for signal in (post_save, post_delete):
+            signal.connect(
+                receiver=signals.invalidate_favorites_receiver,
+                sender=Favorite,
+                dispatch_uid="invalidate_favorites",
+            )
 
+        post_save.connect(
+            receiver=signals.search_index_product_receiver,
+            sender=Product,
+            dispatch_uid="search_index_product",
+        )
+        post_delete.connect(
+            receiver=signals.search_remove_product_receiver,
+            sender=Product,
+            dispatch_uid="search_remove_product",
+        )
+        post_save.connect(
+            receiver=signals.search_index_brand_receiver,
+            sender=Brand,
+            dispatch_uid="search_index_brand",
+        )
+        post_save.connect(
+            receiver=signals.suggest_product_receiver,
+            sender=Product,
+            dispatch_uid="suggest_product",
+        )
+        post_save.connect(
+            receiver=signals.suggest_brand_receiver,
+            sender=Brand,
+            dispatch_uid="suggest_brand",
+        )
+        for model in (Product, Brand):
+            post_delete.connect(
+                receiver=signals.suggest_remove_receiver,
+                sender=model,
+                dispatch_uid=f"suggest_remove_{model.__name__}",
+            )
+        connection_created.connect(
+            receiver=signals.search_availability_receiver,
+            dispatch_uid="search_availability",
+        )
+        post_migrate.connect(
+            receiver=signals.search_post_migrate_receiver,
+            sender=self,
+            dispatch_uid="search_post_migrate",
+        )
         signals.order_created.connect(
-            receiver=signals.send_mail_receiver,
+            receiver=signals.order_email_receiver,
             sender=Order,
             dispatch_uid="email_sender",
         )
@@ -0,0 +1,119 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+CATALOG_VERSION_KEY = "store:catalog_version"
+RESPONSE_CACHE_TIMEOUT = 60 * 15
+
+
+def catalog_cache():
+    return caches["catalog"]
+
+
+def bump_catalog_version():
+    """
+    Marks every cached catalog read (counts, responses) as stale. The version
+    is a nanosecond timestamp so it also tells when the catalog last changed.
+    """
+    version = time.time_ns()
+    catalog_cache().set(CATALOG_VERSION_KEY, version, None)
+    return version
+
+
+def catalog_version():
+    cache = catalog_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+
+    if version is None:
+        version = time.time_ns()
+        cache.set(CATALOG_VERSION_KEY, version, None)
+
+    return version
+
+
+async def acatalog_version():
+    cache = catalog_cache()
+    version = await cache.aget(CATALOG_VERSION_KEY)
+
+    if version is None:
+        version = time.time_ns()
+        await cache.aset(CATALOG_VERSION_KEY, version, None)
+
+    return version
+
+
+def response_key(request: HttpRequest, version: int) -> str:
+    params = sorted(
+        (key, sorted(values)) for key, values in request.GET.lists() if values
+    )
+    raw = f"{request.path}|{params}|{get_language()}"
+    return f"store:response:{version}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def cache_response(run=None, *, overlay=None):
+    """
+    Caches the rendered 200 responses of a catalog read, keyed on path +
+    normalized query params + active language, until the catalog version
+    changes. Responses carry ETag/Last-Modified, and a matching conditional
+    GET is answered with 304 straight from the cache.
+
+    The cached payload is the anonymous one. Authenticated requests bypass
+    the cache, unless an `overlay(request, user, content)` coroutine is given
+    to add the per-user parts on top of the shared content.
+
+    Applied with ninja's `decorate_view`, so it wraps the whole operation
+    and sees the final HttpResponse.
+    """
+    if run is None:
+        return lambda run: cache_response(run, overlay=overlay)
+
+    @wraps(run)
+    async def wrapper(request: HttpRequest, *args, **kwargs):
+        user = await request.auser()
+
+        if request.method != "GET" or (user.is_authenticated and overlay is None):
+            return await run(request, *args, **kwargs)
+
+        cache = catalog_cache()
+        version = await acatalog_version()
+        key = response_key(request, version)
+        entry = await cache.aget(key)
+
+        if entry is None:
+            response = await run(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            entry = {
+                "content": response.content,
+                "content_type": response["Content-Type"],
+                "etag": quote_etag(hashlib.md5(response.content).hexdigest()),
+            }
+            await cache.aset(key, entry, RESPONSE_CACHE_TIMEOUT)
+
+        if user.is_authenticated:
+            content = await overlay(request, user, entry["content"])
+            response = HttpResponse(content, content_type=entry["content_type"])
+            patch_vary_headers(response, ["Accept-Language", "Cookie"])
+            return response
+
+        response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        last_modified = version // 10**9
+        response["ETag"] = entry["etag"]
+        response["Last-Modified"] = http_date(last_modified)
+        patch_vary_headers(response, ["Accept-Language", "Cookie"])
+
+        return get_conditional_response(
+            request,
+            etag=entry["etag"],
+            last_modified=last_modified,
+            response=response,
+        )
+
+    return wrapper
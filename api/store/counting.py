@@ -0,0 +1,99 @@
+import hashlib
+import json
+from enum import Enum
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+
+from .caching import acatalog_version, catalog_cache
+from .models import Product
+
+COUNT_CACHE_TIMEOUT = 60 * 5
+
+
+class CountMode(Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    HAS_MORE = "has_more"
+
+
+def filters_key(filters) -> str:
+    """
+    Hashes the filter values so that the same selection in a different
+    parameter order, or with repeated values, maps to the same cache key.
+    """
+    normalized = {}
+
+    for name, value in filters.model_dump(mode="json").items():
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = sorted(set(value))
+        normalized[name] = value
+
+    payload = json.dumps(normalized, sort_keys=True)
+    return hashlib.md5(payload.encode()).hexdigest()
+
+
+def has_filters(filters) -> bool:
+    return any(value is not None for value in filters.model_dump().values())
+
+
+async def cached_count(queryset: QuerySet, key: str) -> int:
+    cache = catalog_cache()
+    version = await acatalog_version()
+    cache_key = f"store:product_count:{version}:{key}"
+
+    count = await cache.aget(cache_key)
+
+    if count is None:
+        count = await queryset.acount()
+        await cache.aset(cache_key, count, COUNT_CACHE_TIMEOUT)
+
+    return count
+
+
+@sync_to_async
+def _table_estimate():
+    connection = connections[Product.objects.db]
+    table = Product._meta.db_table
+
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    elif connection.vendor == "sqlite":
+        # Only present after ANALYZE; the first number of `stat` is the row count.
+        sql = "SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s"
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+
+    return row[0]
+
+
+async def product_count(queryset: QuerySet, filters, mode: CountMode):
+    """
+    Counts the filtered products according to `mode`:
+
+    - EXACT: COUNT(*) cached per filter selection until the catalog changes.
+    - ESTIMATED: planner statistics for unfiltered listings, EXACT otherwise.
+    - HAS_MORE: no count at all, callers rely on fetching one extra row.
+    """
+    if mode == CountMode.HAS_MORE:
+        return None
+
+    if mode == CountMode.ESTIMATED and not has_filters(filters):
+        estimate = await _table_estimate()
+        if estimate is not None:
+            return estimate
+
+    return await cached_count(queryset, filters_key(filters))
@@ -1,7 +1,12 @@
+from decimal import Decimal
 from enum import Enum
 from typing import List
 from ninja import Field, FilterSchema
 from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from pydantic import ValidationInfo, field_validator
+
+from .models import Product
 
 
 class GenderEnum(Enum):
@@ -17,11 +22,56 @@ class SeasonEnum(Enum):
 
 
 class ProductFilter(FilterSchema):
-    search: str = Field(None, q=["name__icontains", "brand__name__icontains"])
+    search: str = Field(None)
     gender: GenderEnum = Field(None)
     brands: List[str] = Field(None, q=["brand__slug__in"])
-    groups: List[str] = Field(None, q=["groups__slug__in"])
+    groups: List[str] = Field(None)
     season: SeasonEnum = Field(None)
+    min_price: Decimal = Field(None)
+    max_price: Decimal = Field(None)
+    size: int = Field(None)
+
+    @field_validator("size")
+    def validate_size(cls, v, info: ValidationInfo):
+        assert v is None or v in Product.SIZES, _(
+            _("Wrong %(field_name)s format") % {"field_name": info.field_name}
+        )
+        return v
+
+    def filter(self, queryset):
+        queryset = super().filter(queryset)
+
+        if self.min_price is not None or self.max_price is not None:
+            queryset = queryset.price_between(self.min_price, self.max_price, self.size)
+
+        if self.search:
+            queryset = queryset.search(self.search)
+
+        return queryset
+
+    def filter_search(self, search: str) -> Q:
+        # Applied in filter() so that the results can be ranked by relevance.
+        return Q()
+
+    def filter_min_price(self, min_price: Decimal) -> Q:
+        # The price bounds and size are applied together in filter(), a product
+        # matches when one bottle size is within both bounds.
+        return Q()
+
+    def filter_max_price(self, max_price: Decimal) -> Q:
+        return Q()
+
+    def filter_size(self, size: int) -> Q:
+        return Q()
+
+    def filter_groups(self, groups: List[str]) -> Q:
+        if not groups:
+            return Q()
+
+        # Joining the M2M table would return a product once per matching group,
+        # a subquery on the through table keeps rows unique without DISTINCT.
+        memberships = Product.groups.through.objects.filter(group__slug__in=groups)
+        return Q(id__in=memberships.values("product_id"))
 
     def filter_gender(self, gender: GenderEnum) -> Q:
         if gender == GenderEnum.MALE:
@@ -0,0 +1,115 @@
+"""
+The in-memory catalog indexes, e.g. suggest. Each is loaded in full by
+build(), which the ASGI and WSGI entry points run at startup, and then kept
+current by the store signals. Updates that arrive while a build is running
+are queued and replayed on top of the loaded data, so a write racing the
+build isn't lost.
+
+The signals only reach the index of the process that wrote. An index also
+remembers the catalog version it was loaded at, and refresh() loads it
+again once the shared version moves on, i.e. after another worker wrote,
+or when the last build failed.
+"""
+
+import logging
+import threading
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class SignalMaintainedIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.built = False
+        self.version = None
+        self._pending_lock = threading.Lock()
+        self._pending = None
+        self._reset()
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _load(self):
+        raise NotImplementedError
+
+    def build(self, version=None):
+        """Loads the index from the database, as of the catalog `version`."""
+        with self.lock:
+            with self._pending_lock:
+                self._pending = []
+
+            try:
+                self.built = False
+                self._reset()
+                self._load()
+
+                with self._pending_lock:
+                    for update, args in self._pending:
+                        update(*args)
+                    self.version = version
+                    self.built = True
+            finally:
+                with self._pending_lock:
+                    self._pending = None
+
+    def is_current(self, version) -> bool:
+        return self.built and self.version == version
+
+    def refresh(self, version) -> bool:
+        """
+        Builds the index unless it is current with the catalog `version`.
+        Read the version before calling: a write committed during the build
+        moves it on again, and the next refresh picks the write up.
+        """
+        with self.lock:
+            if self.is_current(version):
+                return True
+
+            try:
+                self.build(version)
+            except Exception:
+                logger.exception("Could not build %s", type(self).__name__)
+
+            return self.built
+
+    def _update(self, update, *args):
+        """
+        Applies a signal's update, or queues it while a build is running.
+        Before the first build there is nothing to update: the build reads
+        the change from the database.
+        """
+        with self._pending_lock:
+            if self._pending is not None:
+                self._pending.append((update, args))
+                return
+            if not self.built:
+                return
+
+        with self.lock:
+            update(*args)
+
+
+def build_indexes():
+    """
+    Builds the catalog indexes, in a thread of its own: under ASGI the
+    application is loaded inside the event loop, where the ORM can't run.
+    An index that fails to build is built again by its next refresh().
+    """
+    from .caching import catalog_version
+    from .suggest import index as suggest_index
+
+    def build():
+        try:
+            version = catalog_version()
+            for index in (suggest_index,):
+                index.refresh(version)
+        except Exception:
+            logger.exception("Could not build the catalog indexes")
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=build, name="build-indexes")
+    thread.start()
+    thread.join()
@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from account.models import User
+from store.api import PAGE_SIZE, OrderChoices
+from store.filters import ProductFilter
+from store.models import Favorite, Order, OrderItem, Product
+from store.pagination import keyset_paginate
+from store.serializers import ORDER_FIELDS, product_fields
+
+
+def hot_queries():
+    """
+    The main query of each endpoint, built the way store.api builds it, so
+    that a plan change (e.g. a dropped index) shows up in the output.
+    """
+    user = User(pk=1)
+    products = Product.objects.all().payload()
+    brand = Product.objects.values_list("brand__slug", flat=True).first() or "brand"
+
+    queries = {"product_list": products.order_by("id")[:PAGE_SIZE]}
+
+    for ordering in OrderChoices:
+        queries[f"product_list ordering={ordering.value}"] = keyset_paginate(
+            products, ordering.value, ""
+        )[:PAGE_SIZE]
+
+    for name, params in {
+        "gender": {"gender": "M"},
+        "season": {"season": "AW"},
+        "gender+season": {"gender": "F", "season": "SS"},
+        "brands": {"brands": [brand]},
+        "groups": {"groups": ["group"]},
+        "price": {"min_price": 100, "max_price": 300},
+        "price+size": {"min_price": 100, "max_price": 300, "size": 30},
+        "search": {"search": "rose"},
+    }.items():
+        filtered = ProductFilter(**params).filter(products)
+        queries[f"product_list {name}"] = filtered[:PAGE_SIZE]
+        queries[f"product_list {name} count"] = filtered.values("id")
+
+    queries["product_detail"] = products.filter(brand__slug=brand, slug="product")[:1]
+    queries["favorite_list"] = Favorite.objects.filter(user=user).values(
+        "id", *product_fields("product__")
+    )
+    queries["order_list"] = (
+        Order.objects.filter(user=user)
+        .with_totals()
+        .order_by("-ordered_at")
+        .values(*ORDER_FIELDS)
+    )
+    queries["order_list items"] = (
+        OrderItem.objects.filter(order_id__in=[1, 2, 3])
+        .order_by("id")
+        .values("id", "order_id", *product_fields("product__"))
+    )
+    queries["order_complete"] = Order.objects.filter(completed=False)
+
+    return queries
+
+
+class Command(BaseCommand):
+    help = "Prints the EXPLAIN output of the hot queries of the store API."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Only explain the queries whose name contains one of these.",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run the queries too (EXPLAIN ANALYZE, PostgreSQL only).",
+        )
+
+    def handle(self, *args, names, analyze, **options):
+        explain_options = {}
+        if analyze and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        for name, queryset in hot_queries().items():
+            if names and not any(part in name for part in names):
+                continue
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"== {name}"))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
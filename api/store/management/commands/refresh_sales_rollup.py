@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from store import rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls the newly completed orders up into the daily product sales and "
+        "refreshes the weekly/monthly best-seller counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the rollup and recount every completed order.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, rebuild, batch_size, **options):
+        if rebuild:
+            orders = rollup.rebuild(batch_size)
+        else:
+            orders = rollup.roll_up(batch_size)
+
+        self.stdout.write(f"Rolled up {orders} orders")
@@ -0,0 +1,47 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.outbox import deliver_pending
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Delivers the queued emails in batches, polling for new ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait when there is nothing to send.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Deliver what is due and exit.",
+        )
+
+    def handle(self, *args, batch_size, interval, once, **options):
+        while True:
+            try:
+                sent, failed = deliver_pending(batch_size)
+            except Exception:
+                # E.g. the database going away: wait and poll again.
+                logger.exception("Could not deliver the outbox")
+                sent = failed = 0
+
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+
+            if once and sent + failed < batch_size:
+                return
+
+            if not (sent or failed):
+                try:
+                    time.sleep(interval)
+                except KeyboardInterrupt:
+                    return
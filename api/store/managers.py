@@ -1,4 +1,5 @@
 from django.db.models import (
+    Q,
     Manager,
     QuerySet,
     Prefetch,
@@ -6,12 +7,65 @@ from django.db.models import (
     Value,
     Subquery,
     BooleanField,
+    DecimalField,
+    F,
+    Sum,
 )
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.functions import Coalesce
 from django.apps import apps
 from django.db.models.query import QuerySet
 
+from . import search
+from .caching import bump_catalog_version, catalog_cache
+
+CENT = Decimal("0.01")
+
+
+def order_total(total):
+    """
+    The with_totals() `total_price` as Order.price sums it item by item.
+    SQLite doesn't quantize annotations, so 450.90 comes back as
+    450.900000000000 and 60.00 as 60. Orders without items stay 0.
+    """
+    return total.quantize(CENT) if total else Decimal(0)
+
 
 class ProductQuerySet(QuerySet):
+    def search(self, text):
+        return search.search(self, text)
+
+    def price_between(self, min_price=None, max_price=None, size=None):
+        """
+        Products with a bottle price in the range, of the given size or of
+        any size when none is given. Each size is an indexed generated column.
+        """
+        product = apps.get_model("store", "Product")
+        sizes = [size] if size else product.SIZES
+
+        q = Q()
+        for size in sizes:
+            bounds = {}
+            if min_price is not None:
+                bounds[f"price_{size}__gte"] = min_price
+            if max_price is not None:
+                bounds[f"price_{size}__lte"] = max_price
+            q |= Q(**bounds)
+
+        return self.filter(q)
+
+    def payload(self, fields=None, *extra):
+        """
+        values() rows with only the columns of the payload `fields` (all by
+        default) and `extra`, for store.serializers.
+        """
+        from .serializers import product_fields
+
+        return self.values(*product_fields(fields=fields), *extra)
+
     def with_favorite(self, user=None):
         favorite = apps.get_model("store", "Favorite")
 
@@ -33,7 +87,104 @@ class ProductManager(Manager):
         return ProductQuerySet(self.model, using=self._db).select_related("brand")
 
 
+FAVORITES_CACHE_TIMEOUT = 60 * 60
+
+
+class FavoriteManager(Manager):
+    @staticmethod
+    def cache_key(user_id):
+        return f"store:favorites:{user_id}"
+
+    async def aproduct_map(self, user):
+        """
+        Returns the user's favorites as {product_id: favorite_id}, loaded with
+        one indexed query and cached until the user's favorites change. The
+        map lives in the catalog cache, shared by the workers in prod, so a
+        write made on one worker invalidates it for all of them.
+        """
+        cache = catalog_cache()
+        key = self.cache_key(user.pk)
+        favorites = await cache.aget(key)
+
+        if favorites is None:
+            rows = self.filter(user=user).values_list("product_id", "id")
+            favorites = {product_id: id async for product_id, id in rows}
+            await cache.aset(key, favorites, FAVORITES_CACHE_TIMEOUT)
+
+        return favorites
+
+    def invalidate(self, user_id):
+        catalog_cache().delete(self.cache_key(user_id))
+
+
 class OrderQuerySet(QuerySet):
+    def complete(self):
+        """
+        Completes the orders that aren't completed yet and adds the ordered
+        quantities to the products' sales, in one transaction with set-based
+        UPDATEs. The pending orders are locked first, so concurrent calls
+        never count an order twice. Returns the number of orders completed.
+        """
+        order_item = apps.get_model("store", "OrderItem")
+        product = apps.get_model("store", "Product")
+
+        with transaction.atomic(using=self.db):
+            pending = self.model._base_manager.filter(
+                pk__in=self.values("pk"), completed=False
+            ).select_for_update()
+            ids = list(pending.values_list("pk", flat=True))
+            if not ids:
+                return 0
+
+            # completed is checked again: select_for_update is a no-op on
+            # SQLite, where another call may have completed some of them since.
+            now = timezone.now()
+            completed = self.model._base_manager.filter(
+                pk__in=ids, completed=False
+            ).update(completed=True, completed_at=now)
+            if not completed:
+                return 0
+
+            # Only the orders this UPDATE flipped, told apart by completed_at.
+            flipped = self.model._base_manager.filter(pk__in=ids, completed_at=now)
+            items = order_item.objects.filter(order_id__in=flipped.values("pk"))
+            sold = (
+                items.filter(product_id=OuterRef("pk"))
+                .values("product_id")
+                .annotate(total=Sum("quantity"))
+                .values("total")
+            )
+            product._base_manager.filter(pk__in=items.values("product_id")).update(
+                sales=F("sales") + Subquery(sold)
+            )
+
+            transaction.on_commit(bump_catalog_version, using=self.db)
+
+        return completed
+
+    def with_totals(self):
+        """Annotates `total_price`, summed by the database instead of per item in Python."""
+        order_item = apps.get_model("store", "OrderItem")
+
+        # A correlated subquery rather than a JOIN + GROUP BY, so the orders
+        # can still be read in index order, e.g. by (user, -ordered_at).
+        totals = (
+            order_item.objects.filter(order_id=OuterRef("pk"))
+            .values("order_id")
+            .annotate(
+                total=Sum(F("size") * F("quantity") * F("product__price_per_gram"))
+            )
+            .values("total")
+        )
+
+        return self.annotate(
+            total_price=Coalesce(
+                Subquery(totals),
+                0,
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+
     def prefetch_def(self, user):
         order_item = apps.get_model("store", "OrderItem")
         product = apps.get_model("store", "Product")
@@ -46,5 +197,6 @@ class OrderQuerySet(QuerySet):
                         queryset=product.objects.all().with_favorite(user),  # type: ignore
                     )
                 ),
+                to_attr="item_list",
             )
         )
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from store.search import create_index
+
+    create_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from store.search import drop_index
+
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0003_product_sales"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
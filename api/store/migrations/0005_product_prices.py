@@ -0,0 +1,69 @@
+# Generated by Django 5.0.4 on 2026-10-17 18:59
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0004_product_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="price_15",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.math.Round(
+                    django.db.models.expressions.CombinedExpression(
+                        models.F("price_per_gram"), "*", models.Value(15)
+                    ),
+                    2,
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=6),
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="price_30",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.math.Round(
+                    django.db.models.expressions.CombinedExpression(
+                        models.F("price_per_gram"), "*", models.Value(30)
+                    ),
+                    2,
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=6),
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="price_50",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.functions.math.Round(
+                    django.db.models.expressions.CombinedExpression(
+                        models.F("price_per_gram"), "*", models.Value(50)
+                    ),
+                    2,
+                ),
+                output_field=models.DecimalField(decimal_places=2, max_digits=6),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price_15"], name="store_product_price_15_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price_30"], name="store_product_price_30_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["price_50"], name="store_product_price_50_idx"),
+        ),
+    ]
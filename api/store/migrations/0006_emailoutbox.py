@@ -0,0 +1,64 @@
+# Generated by Django 5.0.4 on 2026-10-17 19:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0005_product_prices"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailOutbox",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("subject", models.CharField(max_length=255, verbose_name="mövzu")),
+                ("body", models.TextField(verbose_name="mətn")),
+                ("from_email", models.CharField(blank=True, max_length=254, null=True)),
+                ("recipients", models.JSONField(default=list, verbose_name="alıcılar")),
+                (
+                    "attempts",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="cəhdlər"),
+                ),
+                (
+                    "next_attempt_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="növbəti cəhd"
+                    ),
+                ),
+                (
+                    "sent_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="göndərilib"
+                    ),
+                ),
+                ("last_error", models.TextField(blank=True, verbose_name="xəta")),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="yaradılıb"),
+                ),
+            ],
+            options={
+                "verbose_name": "Məktub",
+                "verbose_name_plural": "Məktublar",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sent_at__isnull", True)),
+                        fields=["next_attempt_at"],
+                        name="store_emailoutbox_pending_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.0.4 on 2026-10-17 19:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("store", "0006_emailoutbox"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSalesDay",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="gün")),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(default=0, verbose_name="miqdar"),
+                ),
+            ],
+            options={
+                "verbose_name": "Günlük satış",
+                "verbose_name_plural": "Günlük satışlar",
+            },
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="completed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="çatdırılma tarixi"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="sales_rolled_up",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="sales_30d",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name="Aylıq satış"
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="sales_7d",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name="Həftəlik satış"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="product",
+            name="sales",
+            field=models.PositiveIntegerField(
+                db_index=True, default=0, verbose_name="Satış sayı"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("completed", True), ("sales_rolled_up", False)),
+                fields=["id"],
+                name="store_order_rollup_pending_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productsalesday",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="sales_days",
+                to="store.product",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productsalesday",
+            index=models.Index(
+                fields=["day", "product"], name="store_produ_day_ced847_idx"
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="productsalesday",
+            unique_together={("product", "day")},
+        ),
+    ]
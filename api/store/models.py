@@ -1,10 +1,13 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Round
 from django.urls import reverse
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from phonenumber_field.modelfields import PhoneNumberField
 
 from account.models import User
-from .managers import OrderQuerySet, ProductManager
+from .managers import FavoriteManager, OrderQuerySet, ProductManager, order_total
 
 
 class Brand(models.Model):
@@ -35,6 +38,17 @@ class Product(models.Model):
     class Meta:
         verbose_name = "Ətir"
         verbose_name_plural = "Ətirlər"
+        indexes = [
+            # Orderings of product_list, with id as the keyset tie-breaker
+            models.Index(fields=["name", "id"], name="store_product_name_idx"),
+            models.Index(fields=["price_per_gram", "id"], name="store_product_ppg_idx"),
+            # ProductFilter
+            models.Index(fields=["gender", "season"], name="store_product_gender_idx"),
+            models.Index(fields=["brand", "name"], name="store_product_brand_idx"),
+            models.Index(fields=["price_15"], name="store_product_price_15_idx"),
+            models.Index(fields=["price_30"], name="store_product_price_30_idx"),
+            models.Index(fields=["price_50"], name="store_product_price_50_idx"),
+        ]
 
     objects = ProductManager()
 
@@ -58,17 +72,47 @@ class Product(models.Model):
     )
     gender = models.CharField("Cins", max_length=1, choices=GENDERS, default="U")
     season = models.CharField("Fəsil", max_length=2, choices=SEASONS)
-    sales = models.PositiveIntegerField("Satış sayı", default=0)
+    sales = models.PositiveIntegerField("Satış sayı", default=0, db_index=True)
+    # Refreshed from ProductSalesDay by `manage.py refresh_sales_rollup`
+    sales_7d = models.PositiveIntegerField("Həftəlik satış", default=0, db_index=True)
+    sales_30d = models.PositiveIntegerField("Aylıq satış", default=0, db_index=True)
+
+    # Bottle prices computed by the database, so they stay consistent through
+    # bulk updates and can be filtered, sorted and indexed in SQL. Rounded,
+    # as SQLite multiplies REALs: 29.46 * 15 is stored as 441.90000000000003.
+    price_15 = models.GeneratedField(
+        expression=Round(F("price_per_gram") * 15, 2),
+        output_field=models.DecimalField(max_digits=6, decimal_places=2),
+        db_persist=True,
+    )
+    price_30 = models.GeneratedField(
+        expression=Round(F("price_per_gram") * 30, 2),
+        output_field=models.DecimalField(max_digits=6, decimal_places=2),
+        db_persist=True,
+    )
+    price_50 = models.GeneratedField(
+        expression=Round(F("price_per_gram") * 50, 2),
+        output_field=models.DecimalField(max_digits=6, decimal_places=2),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"{self.brand} {self.name}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        if not adding:
+            # The database has recomputed the prices, drop the stale copies.
+            for size in self.SIZES:
+                self.__dict__.pop(f"price_{size}", None)
+
     @property
     def prices(self):
         return {
-            15: self.price_per_gram * 15,
-            30: self.price_per_gram * 30,
-            50: self.price_per_gram * 50,
+            size: self.__dict__.get(f"price_{size}", self.price_per_gram * size)
+            for size in self.SIZES
         }
 
     @property
@@ -88,6 +132,8 @@ class Favorite(models.Model):
         verbose_name_plural = "Seçilmişlər"
         unique_together = (("product", "user"),)
 
+    objects = FavoriteManager()
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="favorites")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
 
@@ -99,6 +145,22 @@ class Order(models.Model):
     class Meta:
         verbose_name = "Sifariş"
         verbose_name_plural = "Sifarişlər"
+        indexes = [
+            # order_list
+            models.Index(
+                fields=["user", "-ordered_at"], name="store_order_user_ordered_idx"
+            ),
+            models.Index(
+                fields=["ordered_at"],
+                condition=models.Q(completed=False),
+                name="store_order_open_idx",
+            ),
+            models.Index(
+                fields=["id"],
+                condition=models.Q(completed=True, sales_rolled_up=False),
+                name="store_order_rollup_pending_idx",
+            ),
+        ]
 
     objects = OrderQuerySet.as_manager()
 
@@ -109,23 +171,19 @@ class Order(models.Model):
     commentary = models.TextField("rəy", null=True, blank=True)
     completed = models.BooleanField("çatdırılıb", default=False)
     ordered_at = models.DateTimeField("sifariş tarixi", auto_now_add=True)
+    completed_at = models.DateTimeField("çatdırılma tarixi", null=True, blank=True)
+    # Whether the items were counted into ProductSalesDay yet
+    sales_rolled_up = models.BooleanField(default=False)
 
     def complete(self):
-        if self.completed:
-            return
-
-        self.completed = True
-        self.save()
-
-        products = [item.product for item in self.items.select_related("product").all()]
-
-        for product in products:
-            product.sales += 1
-
-        Product.objects.bulk_update(products, ["sales"])
+        type(self).objects.filter(pk=self.pk).complete()
+        self.refresh_from_db(fields=["completed", "completed_at"])
 
     @property
     def price(self):
+        if "total_price" in self.__dict__:
+            return order_total(self.total_price)
+
         price = 0
 
         for item in self.items.all():  # type: ignore
@@ -149,3 +207,50 @@ class OrderItem(models.Model):
     @property
     def price(self):
         return self.product.price_per_gram * self.size * self.quantity
+
+
+class ProductSalesDay(models.Model):
+    """Quantity of a product sold in the orders completed on a day."""
+
+    class Meta:
+        verbose_name = "Günlük satış"
+        verbose_name_plural = "Günlük satışlar"
+        unique_together = (("product", "day"),)
+        indexes = [models.Index(fields=["day", "product"])]
+
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="sales_days"
+    )
+    day = models.DateField("gün")
+    quantity = models.PositiveIntegerField("miqdar", default=0)
+
+
+class EmailOutbox(models.Model):
+    """
+    Emails waiting for delivery. Rows are written in the same transaction as
+    the change they announce and sent later by `manage.py run_outbox`.
+    """
+
+    class Meta:
+        verbose_name = "Məktub"
+        verbose_name_plural = "Məktublar"
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(sent_at__isnull=True),
+                name="store_emailoutbox_pending_idx",
+            )
+        ]
+
+    subject = models.CharField("mövzu", max_length=255)
+    body = models.TextField("mətn")
+    from_email = models.CharField(max_length=254, null=True, blank=True)
+    recipients = models.JSONField("alıcılar", default=list)
+    attempts = models.PositiveSmallIntegerField("cəhdlər", default=0)
+    next_attempt_at = models.DateTimeField("növbəti cəhd", default=timezone.now)
+    sent_at = models.DateTimeField("göndərilib", null=True, blank=True)
+    last_error = models.TextField("xəta", blank=True)
+    created_at = models.DateTimeField("yaradılıb", auto_now_add=True)
+
+    def __str__(self):
+        return self.subject
@@ -0,0 +1,148 @@
+import logging
+from datetime import timedelta
+from typing import List, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+MAX_RETRY_DELAY = 60 * 60
+# How long a claimed batch stays away from the other workers. Rows of a
+# worker that died while sending become due again after it.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(subject: str, body: str, recipients: List[str], from_email=None):
+    """Stores an email for delivery, in the caller's transaction."""
+    EmailOutbox = apps.get_model("store", "EmailOutbox")
+
+    return EmailOutbox.objects.create(
+        subject=str(subject),
+        body=str(body),
+        from_email=from_email,
+        recipients=list(recipients),
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff: 30s, 1m, 2m, ... capped at an hour."""
+    delay = settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, MAX_RETRY_DELAY))
+
+
+def pending(now=None):
+    EmailOutbox = apps.get_model("store", "EmailOutbox")
+
+    return EmailOutbox.objects.filter(
+        sent_at__isnull=True,
+        next_attempt_at__lte=now or timezone.now(),
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS,
+    ).order_by("next_attempt_at", "id")
+
+
+def deliver_pending(batch_size: int = 50, connection=None) -> Tuple[int, int]:
+    """
+    Sends up to `batch_size` due emails over a single mail connection and
+    returns (sent, failed). A failed email is retried later with backoff,
+    and given up on after OUTBOX_MAX_ATTEMPTS. When the mail server can't be
+    reached the whole batch is failed and retried.
+    """
+    batch = claim(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    errors = {}
+
+    try:
+        connection.open()
+    except Exception as e:
+        logger.exception("Could not connect to the mail server")
+        errors = dict.fromkeys((email.id for email in batch), _error(e))
+    else:
+        try:
+            for email in batch:
+                errors[email.id] = _send(email, connection)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                logger.exception("Could not close the mail connection")
+
+    return record(batch, errors)
+
+
+def claim(batch_size: int) -> list:
+    """
+    Takes due emails away from the other workers for CLAIM_TIMEOUT and
+    returns them. The claim is committed before anything is sent, so no row
+    lock is held over the SMTP exchange.
+    """
+    EmailOutbox = apps.get_model("store", "EmailOutbox")
+    claimed_until = timezone.now() + CLAIM_TIMEOUT
+
+    with transaction.atomic():
+        # Workers running side by side skip each other's batches.
+        ids = list(
+            pending()
+            .select_for_update(skip_locked=True)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        # Re-checked by the UPDATE: select_for_update is a no-op on SQLite.
+        pending().filter(id__in=ids).update(next_attempt_at=claimed_until)
+
+    return list(
+        EmailOutbox.objects.filter(
+            id__in=ids, sent_at__isnull=True, next_attempt_at=claimed_until
+        ).order_by("id")
+    )
+
+
+def record(batch: list, errors: dict) -> Tuple[int, int]:
+    """Stores the outcome of sending a claimed batch, {id: error or None}."""
+    now = timezone.now()
+    sent = failed = 0
+
+    for email in batch:
+        error = errors[email.id]
+
+        if error is None:
+            email.sent_at = now
+            email.last_error = ""
+            sent += 1
+        else:
+            email.attempts += 1
+            email.next_attempt_at = now + retry_delay(email.attempts)
+            email.last_error = error
+            failed += 1
+
+    type(batch[0]).objects.bulk_update(
+        batch, ["attempts", "next_attempt_at", "sent_at", "last_error"]
+    )
+
+    return sent, failed
+
+
+def _send(email, connection) -> Optional[str]:
+    message = EmailMessage(
+        email.subject,
+        email.body,
+        email.from_email or settings.EMAIL_HOST_USER,
+        email.recipients,
+        connection=connection,
+    )
+
+    try:
+        message.send()
+    except Exception as e:
+        return _error(e)
+
+    return None
+
+
+def _error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from decimal import Decimal
+from typing import Any, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import IntegerField, Q, QuerySet
+
+DEFAULT_ORDERING = "id"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def ordering_keys(ordering: Optional[str]) -> Tuple[str, ...]:
+    """
+    Returns the full ORDER BY used for keyset pagination: the requested
+    ordering plus `id` in the same direction as a tie-breaker.
+    """
+    if ordering is None or ordering.lstrip("-") == "id":
+        return (ordering or DEFAULT_ORDERING,)
+
+    return (ordering, "-id" if ordering.startswith("-") else "id")
+
+
+def encode_cursor(obj: Any, ordering: Optional[str]) -> str:
+    """The cursor of the page after `obj`, a model instance or a values() row."""
+    values = []
+    for key in ordering_keys(ordering):
+        field = key.lstrip("-")
+        value = obj[field] if isinstance(obj, dict) else getattr(obj, field)
+        values.append(str(value) if isinstance(value, Decimal) else value)
+
+    payload = json.dumps([ordering or DEFAULT_ORDERING, values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ordering: Optional[str], model=None) -> list:
+    """
+    The values of the ordering keys carried by the cursor. With a `model`,
+    each is checked against its field and converted, e.g. to Decimal.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_ordering, values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+
+    keys = ordering_keys(ordering)
+
+    if cursor_ordering != (ordering or DEFAULT_ORDERING) or not (
+        isinstance(values, list) and len(values) == len(keys)
+    ):
+        raise InvalidCursor(cursor)
+
+    if model is None:
+        return values
+
+    converted = []
+    for key, value in zip(keys, values):
+        field = model._meta.get_field(key.lstrip("-"))
+        field = getattr(field, "output_field", field)
+        # encode_cursor() writes integers as such and everything else, Decimals
+        # included, as strings. Lists, objects, booleans or nulls would be
+        # coerced into some arbitrary page.
+        expected = int if isinstance(field, IntegerField) else str
+        if type(value) is not expected:
+            raise InvalidCursor(cursor)
+
+        try:
+            converted.append(field.to_python(value))
+        except ValidationError:
+            raise InvalidCursor(cursor)
+
+    return converted
+
+
+def keyset_paginate(
+    queryset: QuerySet, ordering: Optional[str], cursor: Optional[str]
+) -> QuerySet:
+    """
+    Orders the queryset by `ordering_keys(ordering)` and, if a cursor is
+    given, keeps only the rows that come after it. An empty cursor means the
+    first page.
+    """
+    keys = ordering_keys(ordering)
+    queryset = queryset.order_by(*keys)
+
+    if not cursor:
+        return queryset
+
+    values = decode_cursor(cursor, ordering, queryset.model)
+
+    # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+    q = Q()
+    equal = {}
+    for key, value in zip(keys, values):
+        field = key.lstrip("-")
+        lookup = "lt" if key.startswith("-") else "gt"
+        q |= Q(**equal, **{f"{field}__{lookup}": value})
+        equal[field] = value
+
+    try:
+        return queryset.filter(q)
+    except (ValidationError, ValueError, TypeError):
+        raise InvalidCursor(cursor)
@@ -0,0 +1,136 @@
+from datetime import date, timedelta
+from typing import Optional
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .caching import bump_catalog_version
+
+WINDOWS = {"sales_7d": 7, "sales_30d": 30}
+# (product, day) rows incremented per UPDATE, within SQLite's variable limit
+UPDATE_BATCH_SIZE = 500
+
+
+def roll_up_batch(batch_size: int = 1000) -> int:
+    """
+    Adds the items of up to `batch_size` completed, not yet rolled up orders
+    to ProductSalesDay and flags the orders. Returns how many were rolled up.
+    """
+    Order = apps.get_model("store", "Order")
+    OrderItem = apps.get_model("store", "OrderItem")
+    ProductSalesDay = apps.get_model("store", "ProductSalesDay")
+
+    with transaction.atomic():
+        pending = (
+            Order.objects.filter(completed=True, sales_rolled_up=False)
+            .select_for_update(skip_locked=True)
+            .order_by("id")
+        )
+        ids = list(pending.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        # Orders completed before completed_at existed count on their order day.
+        sold = (
+            OrderItem.objects.filter(order_id__in=ids)
+            .annotate(
+                day=TruncDate(Coalesce("order__completed_at", "order__ordered_at"))
+            )
+            .values("product_id", "day")
+            .annotate(quantity=Sum("quantity"))
+        )
+        quantities = {(row["product_id"], row["day"]): row["quantity"] for row in sold}
+
+        # The rows are created empty and incremented in SQL: a run adding to
+        # the same row at the same time waits for its lock and adds on top,
+        # where a read-modify-write would overwrite it.
+        ProductSalesDay.objects.bulk_create(
+            [ProductSalesDay(product_id=p, day=d) for p, d in quantities],
+            ignore_conflicts=True,
+        )
+        keys = list(quantities)
+        for start in range(0, len(keys), UPDATE_BATCH_SIZE):
+            chunk = keys[start : start + UPDATE_BATCH_SIZE]
+            added = Case(
+                *[
+                    When(
+                        product_id=product_id,
+                        day=day,
+                        then=Value(quantities[product_id, day]),
+                    )
+                    for product_id, day in chunk
+                ],
+                default=Value(0),
+            )
+            ProductSalesDay.objects.filter(
+                product_id__in={product_id for product_id, _ in chunk},
+                day__in={day for _, day in chunk},
+            ).update(quantity=F("quantity") + added)
+
+        Order.objects.filter(id__in=ids).update(sales_rolled_up=True)
+
+    return len(ids)
+
+
+def refresh_windows(today: Optional[date] = None) -> int:
+    """
+    Recomputes sales_7d/sales_30d of the products sold within the longest
+    window, and zeroes the ones that dropped out of it, in one UPDATE.
+    """
+    Product = apps.get_model("store", "Product")
+    ProductSalesDay = apps.get_model("store", "ProductSalesDay")
+
+    today = today or timezone.localdate()
+    since = today - timedelta(days=max(WINDOWS.values()) - 1)
+
+    windows = {}
+    for field, days in WINDOWS.items():
+        sold = (
+            ProductSalesDay.objects.filter(
+                product_id=OuterRef("pk"),
+                day__gt=today - timedelta(days=days),
+                day__lte=today,
+            )
+            .values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        windows[field] = Coalesce(Subquery(sold), Value(0))
+
+    recent = ProductSalesDay.objects.filter(day__gte=since).values("product_id")
+    stale = Q()
+    for field in WINDOWS:
+        stale |= Q(**{f"{field}__gt": 0})
+
+    with transaction.atomic():
+        updated = Product._base_manager.filter(Q(pk__in=recent) | stale).update(
+            **windows
+        )
+        transaction.on_commit(bump_catalog_version)
+
+    return updated
+
+
+def roll_up(batch_size: int = 1000, today: Optional[date] = None) -> int:
+    rolled_up = 0
+
+    while batch := roll_up_batch(batch_size):
+        rolled_up += batch
+
+    refresh_windows(today)
+    return rolled_up
+
+
+def rebuild(batch_size: int = 1000, today: Optional[date] = None) -> int:
+    """Recounts the whole history from the completed orders."""
+    Order = apps.get_model("store", "Order")
+    ProductSalesDay = apps.get_model("store", "ProductSalesDay")
+
+    with transaction.atomic():
+        ProductSalesDay.objects.all().delete()
+        Order.objects.filter(sales_rolled_up=True).update(sales_rolled_up=False)
+
+    return roll_up(batch_size, today)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional
 from django.core.exceptions import ValidationError as DjangoValidationError
 from ninja import Field, Schema
 from phonenumber_field.validators import validate_international_phonenumber
@@ -41,11 +41,57 @@ class ProductOutSchema(Schema):
     favorite_id: Optional[int] = None
 
 
+class ProductFieldsSchema(Schema):
+    """
+    `?fields=id,display_name,prices` trims the product payloads to the listed
+    fields of ProductOutSchema. `id` is always kept.
+    """
+
+    fields: Optional[str] = None
+
+    @field_validator("fields")
+    def validate_fields(cls, fields):
+        unknown = set(cls.split(fields) or ()) - set(ProductOutSchema.model_fields)
+
+        assert not unknown, _("Unknown fields: %(fields)s") % {
+            "fields": ", ".join(sorted(unknown))
+        }
+
+        return fields
+
+    @staticmethod
+    def split(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+        names = {name.strip() for name in (fields or "").split(",")} - {""}
+        return frozenset(names | {"id"}) if names else None
+
+    @property
+    def selected(self) -> Optional[FrozenSet[str]]:
+        return self.split(self.fields)
+
+
+class FacetCountsOutSchema(Schema):
+    gender: Dict[str, int]
+    season: Dict[str, int]
+    brands: Dict[str, int]
+    groups: Dict[str, int]
+
+
 class ProductListOutSchema(Schema):
     data: List[ProductOutSchema]
-    count: int
+    count: Optional[int]
     next: Optional[int]
     previous: Optional[int]
+    has_more: bool = False
+    facets: Optional[FacetCountsOutSchema] = None
+    next_cursor: Optional[str] = None
+
+
+class SuggestionOutSchema(Schema):
+    kind: str
+    id: int
+    name: str
+    slug: str
+    detail_url: Optional[str] = None
 
 
 class FavoriteOutSchema(Schema):
@@ -77,6 +123,13 @@ class OrderOutSchema(Schema):
     ordered_at: datetime
     price: Decimal
 
+    @staticmethod
+    def resolve_items(obj):
+        # Set by prefetch_def() and by OrderService.
+        if hasattr(obj, "item_list"):
+            return obj.item_list
+        return obj.items.all()
+
     @staticmethod
     def resolve_phone(obj):
         return str(obj.phone.as_international)
@@ -0,0 +1,183 @@
+import re
+from typing import Dict, List, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "store_product_search"
+
+_available: Dict[str, bool] = {}
+
+
+class SQLiteBackend:
+    """FTS5 virtual table whose rowid is the product id, ranked by bm25."""
+
+    create_sql = [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "name, brand_name, tokenize = 'unicode61 remove_diacritics 2')"
+    ]
+    drop_sql = [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    match_sql = f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+    rank_sql = (
+        f"SELECT rank FROM {SEARCH_TABLE} "
+        f'WHERE {SEARCH_TABLE} MATCH %s AND rowid = "store_product"."id"'
+    )
+
+    delete_sql = f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({{ids}})"
+    insert_sql = (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, name, brand_name) "
+        "SELECT p.id, p.name, b.name FROM store_product p "
+        "INNER JOIN store_brand b ON b.id = p.brand_id WHERE {where}"
+    )
+
+    @staticmethod
+    def query(terms: List[str]) -> str:
+        return " ".join(f'"{term}"*' for term in terms)
+
+
+class PostgreSQLBackend:
+    """tsvector table with a GIN index, ranked by ts_rank (negated, lower is better)."""
+
+    create_sql = [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "product_id bigint PRIMARY KEY "
+        "REFERENCES store_product (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+        "document tsvector NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document "
+        f"ON {SEARCH_TABLE} USING GIN (document)",
+    ]
+    drop_sql = [f"DROP TABLE IF EXISTS {SEARCH_TABLE}"]
+
+    match_sql = (
+        f"SELECT product_id FROM {SEARCH_TABLE} "
+        "WHERE document @@ to_tsquery('simple', %s)"
+    )
+    rank_sql = (
+        f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {SEARCH_TABLE} "
+        f'WHERE product_id = "store_product"."id"'
+    )
+
+    delete_sql = f"DELETE FROM {SEARCH_TABLE} WHERE product_id IN ({{ids}})"
+    insert_sql = (
+        f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+        "SELECT p.id, to_tsvector('simple', p.name || ' ' || b.name) "
+        "FROM store_product p INNER JOIN store_brand b ON b.id = p.brand_id "
+        "WHERE {where}"
+    )
+
+    @staticmethod
+    def query(terms: List[str]) -> str:
+        return " & ".join(f"{term}:*" for term in terms)
+
+
+BACKENDS = {"sqlite": SQLiteBackend, "postgresql": PostgreSQLBackend}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor)
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def refresh_availability(connection) -> bool:
+    available = get_backend(connection) is not None and (
+        SEARCH_TABLE in connection.introspection.table_names()
+    )
+    _available[connection.alias] = available
+    return available
+
+
+def is_available(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Doesn't touch the database, so it is safe to call from async views. The
+    flag is kept up to date by the connection_created/post_migrate receivers.
+    """
+    return _available.get(using, False)
+
+
+def create_index(connection):
+    backend = get_backend(connection)
+    if backend is None:
+        return
+
+    with connection.cursor() as cursor:
+        for sql in backend.create_sql:
+            cursor.execute(sql)
+        cursor.execute(backend.insert_sql.format(where="1 = 1"))
+
+
+def drop_index(connection):
+    backend = get_backend(connection)
+    if backend is None:
+        return
+
+    with connection.cursor() as cursor:
+        for sql in backend.drop_sql:
+            cursor.execute(sql)
+
+
+def reindex(
+    product_ids: Optional[List[int]] = None,
+    brand_ids: Optional[List[int]] = None,
+    using: str = DEFAULT_DB_ALIAS,
+):
+    """Rewrites the index rows of the given products, or of every product of the given brands."""
+    connection = connections[using]
+    if not (is_available(using) or refresh_availability(connection)):
+        return
+
+    backend = get_backend(connection)
+
+    with connection.cursor() as cursor:
+        if brand_ids:
+            placeholders = ", ".join(["%s"] * len(brand_ids))
+            cursor.execute(
+                f"SELECT id FROM store_product WHERE brand_id IN ({placeholders})",
+                brand_ids,
+            )
+            product_ids = [row[0] for row in cursor.fetchall()]
+
+        if not product_ids:
+            return
+
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        cursor.execute(backend.delete_sql.format(ids=placeholders), product_ids)
+        cursor.execute(
+            backend.insert_sql.format(where=f"p.id IN ({placeholders})"), product_ids
+        )
+
+
+def remove(product_ids: List[int], using: str = DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if not (is_available(using) or refresh_availability(connection)):
+        return
+
+    placeholders = ", ".join(["%s"] * len(product_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            get_backend(connection).delete_sql.format(ids=placeholders), product_ids
+        )
+
+
+def search(queryset: QuerySet, text: str) -> QuerySet:
+    """
+    Filters the products matching `text` and orders them by relevance. Falls
+    back to the icontains lookups when the index isn't there.
+    """
+    backend = get_backend(connections[queryset.db])
+    terms = tokenize(text)
+
+    if backend is None or not terms or not is_available(queryset.db):
+        return queryset.filter(Q(name__icontains=text) | Q(brand__name__icontains=text))
+
+    query = backend.query(terms)
+
+    return (
+        queryset.filter(id__in=RawSQL(backend.match_sql, [query]))
+        .annotate(search_rank=RawSQL(backend.rank_sql, [query]))
+        .order_by("search_rank", "id")
+    )
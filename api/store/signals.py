@@ -1,15 +1,79 @@
+from django.apps import apps
 from django.dispatch import Signal
-from django.core.mail import send_mail
 from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Prefetch
 from django.utils.translation import gettext_lazy as _
 
+from . import outbox, search
+from .suggest import index as suggest_index
+from .caching import bump_catalog_version
+
 order_created = Signal()
 
 
-def send_mail_receiver(sender, order, **kwargs):
+def order_email_receiver(sender, order, **kwargs):
+    """Queues the confirmation email, delivered later by `manage.py run_outbox`."""
+    Order = apps.get_model("store", "Order")
+    OrderItem = apps.get_model("store", "OrderItem")
+
+    # OrderService passes the order with its items and total already loaded.
+    if "total_price" not in order.__dict__:
+        items = OrderItem.objects.select_related("product__brand")
+        order = (
+            Order.objects.with_totals()
+            .select_related("user")
+            .prefetch_related(Prefetch("items", queryset=items, to_attr="item_list"))
+            .get(pk=order.pk)
+        )
+    items = order.item_list
+
     email = order.user.email
     subject = _("Order #%(order_id)d") % {"order_id": order.id}
-    txt = "\n".join([str(order_item.product) for order_item in order.items.all()])
+    txt = "\n".join([str(order_item.product) for order_item in items])
     txt += _("\Price: %(order_price)d") % {"order_price": order.price}
     txt += f"\n{order.phone}\n{order.address}"
-    return send_mail(subject, txt, settings.EMAIL_HOST_USER, [email])
+    return outbox.enqueue(subject, txt, [email], settings.EMAIL_HOST_USER)
+
+
+def invalidate_catalog_receiver(sender, using=None, **kwargs):
+    # After the commit: a read between the bump and the commit would cache
+    # the old rows under the new version.
+    transaction.on_commit(bump_catalog_version, using=using)
+
+
+def search_index_product_receiver(sender, instance, using, **kwargs):
+    search.reindex(product_ids=[instance.pk], using=using)
+
+
+def search_remove_product_receiver(sender, instance, using, **kwargs):
+    search.remove([instance.pk], using=using)
+
+
+def search_index_brand_receiver(sender, instance, using, **kwargs):
+    search.reindex(brand_ids=[instance.pk], using=using)
+
+
+def search_availability_receiver(sender, connection, **kwargs):
+    if not search.is_available(connection.alias):
+        search.refresh_availability(connection)
+
+
+def search_post_migrate_receiver(sender, using, **kwargs):
+    search.refresh_availability(connections[using])
+
+
+def suggest_product_receiver(sender, instance, **kwargs):
+    suggest_index.add_product(instance)
+
+
+def suggest_brand_receiver(sender, instance, **kwargs):
+    suggest_index.add_brand(instance)
+
+
+def suggest_remove_receiver(sender, instance, **kwargs):
+    suggest_index.remove(instance._meta.model_name, instance.pk)
+
+
+def invalidate_favorites_receiver(sender, instance, **kwargs):
+    sender.objects.invalidate(instance.user_id)
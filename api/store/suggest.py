@@ -0,0 +1,219 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from django.apps import apps
+
+from .indexes import SignalMaintainedIndex
+
+Key = Tuple[str, int]
+
+KEYS = "keys"  # trie node slot holding the entries below that node
+MIN_SIMILARITY = 0.5
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def words(text: str) -> List[str]:
+    return re.findall(r"\w+", normalize(text))
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class Entry:
+    kind: str
+    id: int
+    name: str
+    slug: str
+    detail_url: Optional[str] = None
+    words: List[str] = field(default_factory=list)
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "id": self.id,
+            "name": self.name,
+            "slug": self.slug,
+            "detail_url": self.detail_url,
+        }
+
+
+class SuggestIndex(SignalMaintainedIndex):
+    """
+    In-memory autocomplete over brand names and product display names.
+
+    Every word of an entry is inserted into a prefix trie whose nodes keep
+    their entries sorted by rank, so the top-k for a prefix is a slice. The
+    trigrams of each distinct word go into an inverted index that is used
+    when the prefixes find too little (typos). Reads never touch the
+    database; the index is loaded with `build()`, maintained by the store
+    signals and loaded again by `refresh()` once the catalog version moves.
+    """
+
+    def _reset(self):
+        self.entries: Dict[Key, Entry] = {}
+        self.trie: dict = {}
+        self.vocabulary: Dict[str, Set[Key]] = {}
+        self.grams: Dict[str, Set[str]] = {}
+
+    def _load(self):
+        Brand = apps.get_model("store", "Brand")
+        Product = apps.get_model("store", "Product")
+
+        for brand in Brand.objects.all():
+            self._add(self._brand_entry(brand))
+
+        for product in Product.objects.all():
+            self._add(self._product_entry(product))
+
+    def _brand_entry(self, brand) -> Entry:
+        return Entry("brand", brand.id, brand.name, brand.slug)
+
+    def _product_entry(self, product) -> Entry:
+        return Entry(
+            "product",
+            product.id,
+            product.display_name,
+            product.slug,
+            detail_url=product.get_absolute_url(),
+        )
+
+    @staticmethod
+    def _rank(entry: Entry):
+        # Brands first, then shorter names, which are the closer completions.
+        return (entry.kind != "brand", len(entry.name), entry.kind, entry.id)
+
+    def _add(self, entry: Entry):
+        key = (entry.kind, entry.id)
+        self._remove(key)
+
+        entry.words = words(entry.name)
+        self.entries[key] = entry
+        rank = self._rank(entry)
+
+        for word in set(entry.words):
+            node = self.trie
+            for char in word:
+                node = node.setdefault(char, {})
+                bisect.insort(node.setdefault(KEYS, []), (rank, key))
+
+            if word not in self.vocabulary:
+                self.vocabulary[word] = set()
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+            self.vocabulary[word].add(key)
+
+    def _remove(self, key: Key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        rank = self._rank(entry)
+
+        for word in set(entry.words):
+            node = self.trie
+            for char in word:
+                node = node[char]
+                ranked = node[KEYS]
+                del ranked[bisect.bisect_left(ranked, (rank, key))]
+
+            self.vocabulary[word].discard(key)
+            if not self.vocabulary[word]:
+                del self.vocabulary[word]
+                for gram in trigrams(word):
+                    self.grams[gram].discard(word)
+
+    def _add_brand(self, brand):
+        self._add(self._brand_entry(brand))
+        # The display names of its products carry the brand name.
+        for product in brand.products.all():
+            self._add(self._product_entry(product))
+
+    def add_brand(self, brand):
+        self._update(self._add_brand, brand)
+
+    def add_product(self, product):
+        self._update(lambda: self._add(self._product_entry(product)))
+
+    def remove(self, kind: str, id: int):
+        self._update(self._remove, (kind, id))
+
+    def _prefix_matches(self, tokens: List[str], limit: int) -> List[Key]:
+        node = self.trie
+        for char in tokens[0]:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        matches = []
+        for _, key in node.get(KEYS, ()):
+            # Every other token has to prefix some word of the entry too.
+            if all(
+                any(word.startswith(token) for word in self.entries[key].words)
+                for token in tokens[1:]
+            ):
+                matches.append(key)
+                if len(matches) == limit:
+                    break
+
+        return matches
+
+    def _fuzzy_matches(self, tokens: List[str]) -> Dict[Key, float]:
+        scores = Counter()
+
+        for token in tokens:
+            query = trigrams(token)
+            shared = Counter()
+            for gram in query:
+                shared.update(self.grams.get(gram, ()))
+
+            best = {}
+            for word, count in shared.items():
+                # Dice coefficient; a word has len(word) + 1 distinct-ish trigrams.
+                similarity = 2 * count / (len(query) + len(word) + 1)
+                if similarity < MIN_SIMILARITY:
+                    continue
+                for key in self.vocabulary[word]:
+                    best[key] = max(best.get(key, 0), similarity)
+
+            scores.update(best)
+
+        return {
+            key: score / len(tokens)
+            for key, score in scores.items()
+            if score / len(tokens) >= MIN_SIMILARITY
+        }
+
+    def suggest(self, text: str, limit: int = 8) -> List[dict]:
+        tokens = words(text)
+        if not tokens:
+            return []
+
+        with self.lock:
+            ranked = self._prefix_matches(tokens, limit)
+
+            if len(ranked) < limit:
+                fuzzy = self._fuzzy_matches(tokens)
+                for key in ranked:
+                    fuzzy.pop(key, None)
+                ranked += heapq.nsmallest(
+                    limit - len(ranked),
+                    fuzzy,
+                    key=lambda key: (-fuzzy[key], self._rank(self.entries[key])),
+                )
+
+            return [self.entries[key].as_dict() for key in ranked]
+
+
+index = SuggestIndex()
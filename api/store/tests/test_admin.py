@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from account.factories import UserFactory
+from ..factories import OrderItemFactory
+from ..models import Order
+
+
+class OrderAdminTest(TestCase):
+    def setUp(self):
+        self.admin = UserFactory.create(is_staff=True, is_superuser=True)
+        self.client.force_login(self.admin)
+
+    def changelist_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("admin:store_order_changelist"))
+            self.assertEqual(res.status_code, 200)
+
+        return len(queries)
+
+    def test_order_changelist_constant_queries(self):
+        OrderItemFactory.create_batch(2)
+        # The first request also loads the session and the user into the cache.
+        self.changelist_queries()
+        expected = self.changelist_queries()
+
+        OrderItemFactory.create_batch(10)
+        self.assertEqual(self.changelist_queries(), expected)
+
+    def test_order_complete_action(self):
+        items = OrderItemFactory.create_batch(3, quantity=2)
+        res = self.client.post(
+            reverse("admin:store_order_changelist"),
+            {
+                "action": "complete_order",
+                "_selected_action": [item.order_id for item in items],
+            },
+        )
+        self.assertEqual(res.status_code, 302)
+        self.assertFalse(Order.objects.filter(completed=False).exists())
+
+        for item in items:
+            item.product.refresh_from_db()
+            self.assertEqual(item.product.sales, 2)
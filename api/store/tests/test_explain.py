@@ -0,0 +1,22 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from ..factories import ProductFactory
+
+
+class ExplainHotQueriesTest(TestCase):
+    def test_explain_hot_queries(self):
+        ProductFactory.create()
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+
+        self.assertIn("== order_list", out.getvalue())
+        self.assertIn("store_order_user_ordered_idx", out.getvalue())
+        self.assertIn("store_product_name_idx", out.getvalue())
+
+    def test_explain_hot_queries_filtered(self):
+        out = StringIO()
+        call_command("explain_hot_queries", "favorite", stdout=out)
+
+        self.assertIn("== favorite_list", out.getvalue())
+        self.assertNotIn("== product_list", out.getvalue())
@@ -1,6 +1,8 @@
+from unittest.mock import patch
 from django.test import TestCase
-from ..factories import FavoriteFactory
-from ..models import Product
+from django.utils import timezone
+from ..factories import FavoriteFactory, OrderFactory, OrderItemFactory
+from ..models import Order, Product
 
 
 class ProductManagerTest(TestCase):
@@ -14,3 +16,50 @@ class ProductManagerTest(TestCase):
             .first()
         )
         self.assertEquals(product.favorite_id, expected)
+
+
+class OrderQuerySetTest(TestCase):
+    def test_order_with_totals(self):
+        order = OrderFactory.create()
+        OrderItemFactory.create_batch(3, order=order)
+
+        expected = sum(item.price for item in order.items.all())
+        order = Order.objects.with_totals().get(id=order.id)
+        self.assertEquals(order.total_price, expected)
+
+        with self.assertNumQueries(0):
+            self.assertEquals(order.price, expected)
+
+    def test_order_with_totals_without_items(self):
+        order = OrderFactory.create()
+        self.assertEquals(Order.objects.with_totals().get(id=order.id).price, 0)
+
+    def test_order_complete(self):
+        orders = OrderFactory.create_batch(2)
+        item = OrderItemFactory.create(order=orders[0], quantity=2)
+        OrderItemFactory.create(order=orders[1], product=item.product, quantity=3)
+
+        self.assertEquals(Order.objects.all().complete(), 2)
+        self.assertEquals(Product.objects.get(id=item.product_id).sales, 5)
+
+        # Completed orders aren't counted twice.
+        self.assertEquals(Order.objects.all().complete(), 0)
+        self.assertEquals(Product.objects.get(id=item.product_id).sales, 5)
+
+    def test_order_complete_concurrent(self):
+        orders = OrderFactory.create_batch(2)
+        item = OrderItemFactory.create(order=orders[0], quantity=2)
+        OrderItemFactory.create(order=orders[1], product=item.product, quantity=3)
+        now = timezone.now
+
+        def complete_first_then_now():
+            # Another call completes the first order after this one read
+            # the pending orders, as can happen on SQLite.
+            Order.objects.filter(id=orders[0].id).update(completed=True)
+            return now()
+
+        with patch("store.managers.timezone.now", complete_first_then_now):
+            self.assertEquals(Order.objects.all().complete(), 1)
+
+        # Only the order this call completed is counted.
+        self.assertEquals(Product.objects.get(id=item.product_id).sales, 3)
@@ -1,5 +1,7 @@
+from decimal import Decimal
 from django.test import TestCase
 from ..factories import ProductFactory, OrderItemFactory, OrderFactory, FavoriteFactory
+from ..models import Order, Product
 
 
 class ProductModelTest(TestCase):
@@ -21,6 +23,15 @@ class ProductModelTest(TestCase):
             expected = expectings[key]
             self.assertEquals(self.product.prices[key], expected)  # type: ignore
 
+    def test_product_prices_generated(self):
+        self.product.price_per_gram = Decimal("12.34")
+        self.product.save()
+        self.assertEquals(self.product.prices[50], Decimal("617.00"))
+
+        product = Product.objects.get(pk=self.product.pk)
+        self.assertEquals(product.price_15, Decimal("185.10"))
+        self.assertEquals(product.price_50, Decimal("617.00"))
+
     def test_product_absolute_url(self):
         expected = f"/api/products/{self.product.brand.slug}_{self.product.slug}"  # type: ignore
         self.assertEquals(self.product.get_absolute_url(), expected)  # type: ignore
@@ -69,3 +80,32 @@ class OrderTest(TestCase):
             return True
 
         self.assertTrue(sales_incremented(self.order))
+
+    def test_order_complete_counts_quantities(self):
+        items = OrderItemFactory.create_batch(2, order=self.order, quantity=3)
+        self.order.complete()  # type: ignore
+
+        for item in items:
+            item.product.refresh_from_db()
+            self.assertEquals(item.product.sales, 3)
+
+    def test_order_complete_twice(self):
+        item = OrderItemFactory.create(order=self.order, quantity=2)
+        self.order.complete()  # type: ignore
+        Order.objects.get(pk=self.order.pk).complete()
+
+        item.product.refresh_from_db()
+        self.assertEquals(item.product.sales, 2)
+
+    def test_orders_complete(self):
+        product = ProductFactory.create()
+        orders = OrderFactory.create_batch(3)
+        for order in orders:
+            OrderItemFactory.create(order=order, product=product, quantity=2)
+        orders[0].complete()  # type: ignore
+
+        self.assertEquals(Order.objects.complete(), 3)  # self.order and 2 more
+        self.assertFalse(Order.objects.filter(completed=False).exists())
+
+        product.refresh_from_db()
+        self.assertEquals(product.sales, 6)
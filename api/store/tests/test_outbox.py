@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from smtplib import SMTPException
+from unittest.mock import patch
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .. import outbox
+from ..models import EmailOutbox
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.emails = [
+            outbox.enqueue(f"Order #{i}", "Body", [f"user{i}@gmail.com"])
+            for i in range(3)
+        ]
+
+    def test_deliver_pending(self):
+        self.assertEqual(outbox.deliver_pending(), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].to, ["user0@gmail.com"])
+        self.assertFalse(EmailOutbox.objects.filter(sent_at__isnull=True).exists())
+
+        # Sent emails aren't delivered twice.
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+    def test_deliver_pending_batch_size(self):
+        self.assertEqual(outbox.deliver_pending(batch_size=2), (2, 0))
+        self.assertEqual(outbox.deliver_pending(batch_size=2), (1, 0))
+
+    def test_deliver_pending_reuses_connection(self):
+        with patch("store.outbox.get_connection", wraps=outbox.get_connection) as get:
+            outbox.deliver_pending()
+        get.assert_called_once()
+
+    def test_deliver_pending_retry(self):
+        with patch.object(
+            mail.EmailMessage, "send", side_effect=SMTPException("unavailable")
+        ):
+            self.assertEqual(outbox.deliver_pending(), (0, 3))
+
+        email = EmailOutbox.objects.get(id=self.emails[0].id)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("unavailable", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Not due yet, then retried once the backoff has passed.
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(outbox.deliver_pending(), (3, 0))
+
+    def test_deliver_pending_gives_up(self):
+        EmailOutbox.objects.update(attempts=settings.OUTBOX_MAX_ATTEMPTS)
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+    def test_deliver_pending_connection_error(self):
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.open",
+            side_effect=ConnectionRefusedError("refused"),
+        ), self.assertLogs("store.outbox", "ERROR"):
+            self.assertEqual(outbox.deliver_pending(), (0, 3))
+
+        for email in EmailOutbox.objects.all():
+            self.assertEqual(email.attempts, 1)
+            self.assertIn("refused", email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_deliver_pending_claims_batch(self):
+        batch = outbox.claim(2)
+        self.assertEqual(len(batch), 2)
+
+        # Claimed rows aren't handed to another worker.
+        self.assertEqual(outbox.deliver_pending(), (1, 0))
+        self.assertEqual(
+            outbox.record(batch, dict.fromkeys(email.id for email in batch)), (2, 0)
+        )
+        self.assertFalse(EmailOutbox.objects.filter(sent_at__isnull=True).exists())
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=10)
+    def test_settings_read_at_call_time(self):
+        self.assertEqual(outbox.retry_delay(2), timedelta(seconds=20))
+        EmailOutbox.objects.update(attempts=2)
+        self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+    def test_retry_delay(self):
+        delay = settings.OUTBOX_RETRY_DELAY
+        self.assertEqual(outbox.retry_delay(1), timedelta(seconds=delay))
+        self.assertEqual(outbox.retry_delay(2), timedelta(seconds=delay * 2))
+        self.assertEqual(
+            outbox.retry_delay(100), timedelta(seconds=outbox.MAX_RETRY_DELAY)
+        )
+
+    def test_run_outbox_command(self):
+        call_command("run_outbox", "--once", stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_run_outbox_command_survives_errors(self):
+        with patch(
+            "store.management.commands.run_outbox.deliver_pending",
+            side_effect=[DatabaseError("locked"), (3, 0), (0, 0)],
+        ) as deliver, patch(
+            "store.management.commands.run_outbox.time.sleep",
+            side_effect=[None, KeyboardInterrupt],
+        ), self.assertLogs(
+            "store.management.commands.run_outbox", "ERROR"
+        ):
+            call_command("run_outbox", stdout=StringIO())
+
+        # Polled again after the error, until interrupted.
+        self.assertEqual(deliver.call_count, 3)
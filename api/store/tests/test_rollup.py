@@ -0,0 +1,113 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from .. import rollup
+from ..factories import OrderFactory, OrderItemFactory, ProductFactory
+from ..models import Order, Product, ProductSalesDay
+
+
+class SalesRollupTest(TestCase):
+    def setUp(self):
+        self.products = ProductFactory.create_batch(3)
+        self.today = timezone.localdate()
+
+    def sell(self, product, quantity, days_ago=0):
+        order = OrderFactory.create()
+        OrderItemFactory.create(order=order, product=product, quantity=quantity)
+        order.complete()
+        Order.objects.filter(id=order.id).update(
+            completed_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return order
+
+    def test_roll_up(self):
+        self.sell(self.products[0], 2)
+        self.sell(self.products[0], 3)
+        self.sell(self.products[1], 1, days_ago=10)
+        self.sell(self.products[2], 4, days_ago=40)
+
+        self.assertEqual(rollup.roll_up(batch_size=2), 4)
+        self.assertEqual(
+            ProductSalesDay.objects.get(product=self.products[0]).quantity, 5
+        )
+
+        sales = {
+            product.id: (product.sales_7d, product.sales_30d)
+            for product in Product.objects.all()
+        }
+        self.assertEqual(sales[self.products[0].id], (5, 5))
+        self.assertEqual(sales[self.products[1].id], (0, 1))
+        self.assertEqual(sales[self.products[2].id], (0, 0))
+
+    def test_roll_up_incremental(self):
+        self.sell(self.products[0], 2)
+        rollup.roll_up()
+        self.sell(self.products[0], 3)
+        OrderFactory.create()  # not completed, not counted
+
+        self.assertEqual(rollup.roll_up(), 1)
+        self.assertEqual(
+            ProductSalesDay.objects.get(product=self.products[0]).quantity, 5
+        )
+
+    def test_roll_up_concurrent_batches(self):
+        self.sell(self.products[0], 1)
+        rollup.roll_up()
+        first = self.sell(self.products[0], 2)
+        self.sell(self.products[0], 3)
+        bulk_create = ProductSalesDay.objects.bulk_create
+
+        def other_run_then_create(*args, **kwargs):
+            # Another run rolls up the second order, same product and day,
+            # while the first batch is in progress.
+            create.side_effect = bulk_create
+            Order.objects.filter(id=first.id).update(sales_rolled_up=True)
+            self.assertEqual(rollup.roll_up_batch(), 1)
+            Order.objects.filter(id=first.id).update(sales_rolled_up=False)
+            return bulk_create(*args, **kwargs)
+
+        with patch.object(
+            ProductSalesDay.objects, "bulk_create", side_effect=other_run_then_create
+        ) as create:
+            self.assertEqual(rollup.roll_up_batch(batch_size=1), 1)
+
+        self.assertEqual(
+            ProductSalesDay.objects.get(product=self.products[0]).quantity, 6
+        )
+
+    def test_refresh_windows_shift(self):
+        self.sell(self.products[0], 2)
+        rollup.roll_up()
+
+        rollup.refresh_windows(self.today + timedelta(days=7))
+        product = Product.objects.get(id=self.products[0].id)
+        self.assertEqual((product.sales_7d, product.sales_30d), (0, 2))
+
+    def test_rebuild(self):
+        self.sell(self.products[0], 2)
+        self.sell(self.products[1], 1, days_ago=3)
+        rollup.roll_up()
+        days = list(
+            ProductSalesDay.objects.values_list("product_id", "day", "quantity")
+        )
+
+        call_command("refresh_sales_rollup", "--rebuild", stdout=StringIO())
+        self.assertCountEqual(
+            ProductSalesDay.objects.values_list("product_id", "day", "quantity"), days
+        )
+
+    def test_product_list_best_sellers(self):
+        self.sell(self.products[1], 3)
+        self.sell(self.products[2], 1)
+        rollup.roll_up()
+
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"ordering": "-sales_7d"}
+        )
+        self.assertEqual(res.status_code, 200)
+        ids = [product["id"] for product in res.json()["data"]]
+        self.assertEqual(ids[:2], [self.products[1].id, self.products[2].id])
@@ -0,0 +1,204 @@
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ninja.renderers import JSONRenderer
+
+from account.factories import UserFactory
+from api.api import api
+
+from ..factories import (
+    BrandFactory,
+    FavoriteFactory,
+    OrderFactory,
+    OrderItemFactory,
+    ProductFactory,
+)
+from ..models import Favorite, Order, Product
+from ..schemas import (
+    FavoriteOutSchema,
+    OrderOutSchema,
+    ProductListOutSchema,
+    ProductOutSchema,
+)
+
+
+def render(data):
+    # The bytes HttpResponse sends for what JSONRenderer returns.
+    return JSONRenderer().render(None, data, response_status=200).encode()
+
+
+class SchemaCompatibilityTest(TestCase):
+    """
+    The values() fast path renders the same bytes as the response schemas
+    through ninja's stock JSONRenderer.
+    """
+
+    def setUp(self):
+        cache.clear()
+        caches["catalog"].clear()
+
+        self.user = UserFactory.create()
+        brand = BrandFactory.create(name="Ağ Çiçək")
+        self.products = ProductFactory.create_batch(10, brand=brand)
+        ProductFactory.create(name="Gül ətri", price_per_gram="29.46")
+
+    def test_renderer(self):
+        self.assertIs(type(api.renderer), JSONRenderer)
+
+    def test_product_list(self):
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"page": 2})
+
+        products = list(Product.objects.all().with_favorite()[8:16])
+        expected = ProductListOutSchema.from_orm(
+            {
+                "data": products,
+                "count": 11,
+                "next": None,
+                "previous": 1,
+                "has_more": False,
+            }
+        ).model_dump()
+        self.assertEqual(res.content, render(expected))
+
+    def test_product_detail(self):
+        product = self.products[0]
+        res = self.client.get(product.get_absolute_url())
+
+        expected = ProductOutSchema.from_orm(
+            Product.objects.all().with_favorite().get(pk=product.pk)
+        ).model_dump()
+        self.assertEqual(res.content, render(expected))
+
+    def test_product_list_cursor(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"cursor": "", "ordering": "-sales"}
+        )
+
+        products = list(Product.objects.all().with_favorite().order_by("-sales", "-id"))
+        payload = res.json()
+        expected = ProductListOutSchema.from_orm(
+            {
+                "data": products[:8],
+                "count": 11,
+                "next": None,
+                "previous": None,
+                "has_more": True,
+                "next_cursor": payload["next_cursor"],
+            }
+        ).model_dump()
+        self.assertEqual(res.content, render(expected))
+
+    def test_favorite_list(self):
+        for product in self.products[:3]:
+            FavoriteFactory.create(user=self.user, product=product)
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse("api-1.0.0:favorite_list"))
+
+        favorites = []
+        for favorite in Favorite.objects.select_related(
+            "product", "product__brand"
+        ).filter(user=self.user):
+            favorite.product.favorite_id = favorite.id
+            favorites.append(FavoriteOutSchema.from_orm(favorite).model_dump())
+        self.assertEqual(res.content, render(favorites))
+
+    def test_order_list(self):
+        FavoriteFactory.create(user=self.user, product=self.products[0])
+        for order in OrderFactory.create_batch(2, user=self.user):
+            OrderItemFactory.create(order=order, product=self.products[0], quantity=2)
+            OrderItemFactory.create(order=order, product=self.products[1], quantity=3)
+        OrderFactory.create(user=self.user, commentary="Tez çatdırın")
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse("api-1.0.0:order_list"))
+
+        orders = (
+            Order.objects.filter(user=self.user)
+            .prefetch_def(self.user)
+            .with_totals()
+            .order_by("-ordered_at")
+        )
+        expected = [OrderOutSchema.from_orm(order).model_dump() for order in orders]
+        self.assertEqual(res.content, render(expected))
+
+
+class SparseFieldsetTest(TestCase):
+    FIELDS = {"fields": "display_name,prices"}
+
+    def setUp(self):
+        cache.clear()
+        caches["catalog"].clear()
+
+        self.user = UserFactory.create()
+        self.products = ProductFactory.create_batch(3)
+
+    def test_product_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("api-1.0.0:product_list"), self.FIELDS)
+
+        self.assertEqual(res.status_code, 200)
+        for product in res.json()["data"]:
+            self.assertEqual(list(product), ["id", "prices", "display_name"])
+
+        sql = queries.captured_queries[-1]["sql"]
+        self.assertIn('"price_15"', sql)
+        self.assertNotIn('"gender"', sql)
+        self.assertNotIn('"brand"."slug"', sql)
+
+    def test_product_list_cursor(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"cursor": "", "ordering": "-sales", "fields": "name"},
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(list(res.json()["data"][0]), ["id", "name"])
+
+    def test_product_detail(self):
+        product = self.products[0]
+        res = self.client.get(product.get_absolute_url(), {"fields": "slug"})
+        self.assertEqual(res.json(), {"id": product.id, "slug": product.slug})
+
+    def test_favorites_overlay(self):
+        favorite = FavoriteFactory.create(user=self.user, product=self.products[0])
+        self.client.force_login(self.user)
+        url = reverse("api-1.0.0:product_list")
+
+        res = self.client.get(url, self.FIELDS)
+        self.assertNotIn("favorite_id", res.json()["data"][0])
+
+        res = self.client.get(url, {"fields": "favorite_id"})
+        favorite_ids = {p["id"]: p["favorite_id"] for p in res.json()["data"]}
+        self.assertEqual(favorite_ids[self.products[0].id], favorite.id)
+
+    def test_favorite_list(self):
+        FavoriteFactory.create(user=self.user, product=self.products[0])
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse("api-1.0.0:favorite_list"), self.FIELDS)
+        [favorite] = res.json()
+        self.assertEqual(list(favorite["product"]), ["id", "prices", "display_name"])
+
+    def test_order_list(self):
+        order = OrderFactory.create(user=self.user)
+        OrderItemFactory.create(order=order, product=self.products[0], quantity=2)
+        self.client.force_login(self.user)
+
+        res = self.client.get(reverse("api-1.0.0:order_list"), {"fields": "name"})
+        [item] = res.json()[0]["items"]
+        self.assertEqual(list(item["product"]), ["id", "name"])
+        self.assertEqual(
+            item["price"], str(self.products[0].price_per_gram * item["size"] * 2)
+        )
+
+    def test_unknown_field(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"fields": "name,secret"}
+        )
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("secret", res.json()["details"]["fields"])
@@ -0,0 +1,48 @@
+from unittest.mock import patch
+from django.test import TestCase
+from account.factories import UserFactory
+from ..factories import FavoriteFactory, ProductFactory
+from ..models import EmailOutbox, Order, OrderItem
+from ..schemas import OrderInSchema, OrderOutSchema
+from ..services import OrderService, UnknownProduct
+
+
+class OrderServiceTest(TestCase):
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.products = ProductFactory.create_batch(3)
+        FavoriteFactory.create(user=self.user, product=self.products[0])
+        self.details = OrderInSchema(
+            phone="+994504448899",
+            address="Baki seheri, Narimanov r.",
+            items=[
+                {"product_id": product.id, "size": 30, "quantity": 2}
+                for product in self.products
+            ],
+        )
+
+    def test_create(self):
+        # SELECT products, INSERT order, INSERT items, INSERT outbox email,
+        # wrapped in a savepoint since the test itself runs in a transaction.
+        with self.assertNumQueries(6):
+            order = OrderService(self.user).create(self.details)
+            out = OrderOutSchema.from_orm(order).model_dump()
+
+        expected = Order.objects.prefetch_def(self.user).with_totals().get(id=order.id)
+        self.assertEqual(out, OrderOutSchema.from_orm(expected).model_dump())
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    def test_create_unknown_product(self):
+        self.details.items[0].product_id = 0
+
+        with self.assertRaises(UnknownProduct):
+            OrderService(self.user).create(self.details)
+        self.assertFalse(Order.objects.exists())
+
+    def test_create_rolls_back(self):
+        with patch.object(OrderItem.objects, "bulk_create", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                OrderService(self.user).create(self.details)
+
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(EmailOutbox.objects.exists())
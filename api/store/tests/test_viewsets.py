@@ -1,5 +1,15 @@
+import base64
+import json
+from decimal import Decimal
+from unittest.mock import patch
 from ninja.testing import TestClient
-from django.test import TestCase
+from django.conf import settings
+from django.core import mail
+from django.core.management import call_command
+from django.core.cache import cache, caches
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from ..factories import (
     BrandFactory,
@@ -8,9 +18,13 @@ from ..factories import (
     FavoriteFactory,
     OrderFactory,
 )
-from ..models import Favorite, Order, OrderItem, Product
+from ..models import EmailOutbox, Favorite, Order, OrderItem, Product
 from account.factories import UserFactory
 from ..api import router
+from ..caching import CATALOG_VERSION_KEY, bump_catalog_version, catalog_version
+from .. import search
+from ..indexes import build_indexes
+from ..suggest import index as suggest_index
 
 
 class NinjaTestCase(TestCase):
@@ -18,6 +32,12 @@ class NinjaTestCase(TestCase):
         super().__init__(method_name)
         self.client = TestClient(router_or_app=router)
 
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cache.clear()
+        caches["catalog"].clear()
+
 
 class BrandListAPIViewTest(NinjaTestCase):
     def setUp(self):
@@ -101,6 +121,17 @@ class ProductListAPIView(NinjaTestCase):
             )
             groups_used_times -= 1
 
+    def test_product_list_multiple_groups_filter(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            [("groups", group.slug) for group in self.groups],
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["count"], self.PRODUCTS_SIZE)
+
+        ids = [product["id"] for product in res.json()["data"]]
+        self.assertEqual(len(ids), len(set(ids)))
+
     def test_product_list_gender_filter(self):
         res = self.client.get(reverse("api-1.0.0:product_list"), {"gender": "M"})
         self.assertEqual(res.status_code, 200)
@@ -115,6 +146,498 @@ class ProductListAPIView(NinjaTestCase):
             res.json()["count"], Product.objects.filter(season="AW").count()
         )
 
+    def test_product_list_price_filter(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"min_price": "100", "max_price": "500", "size": 30},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.json()["count"],
+            Product.objects.filter(price_30__gte=100, price_30__lte=500).count(),
+        )
+
+    def test_product_list_price_filter_any_size(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"min_price": "100", "max_price": "500"}
+        )
+        self.assertEqual(res.status_code, 200)
+
+        expected = [
+            product
+            for product in Product.objects.all()
+            if any(100 <= price <= 500 for price in product.prices.values())
+        ]
+        self.assertEqual(res.json()["count"], len(expected))
+
+    def test_product_list_price_filter_wrong_size(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"min_price": "100", "size": 20}
+        )
+        self.assertEqual(res.status_code, 400)
+
+    def test_product_list_price_ordering(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"ordering": "-price_15"}
+        )
+        self.assertEqual(res.status_code, 200)
+        prices = [Decimal(product["prices"]["15"]) for product in res.json()["data"]]
+        self.assertEqual(prices, sorted(prices, reverse=True))
+
+    def test_product_list_has_more_mode(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"count_mode": "has_more"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(res.json()["count"])
+        self.assertTrue(res.json()["has_more"])
+        self.assertEqual(res.json()["next"], 2)
+
+    def test_product_list_estimated_mode(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"count_mode": "estimated"}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["count"], Product.objects.count())
+
+    def test_product_list_count_cache_invalidation(self):
+        brand = self.brands[0]
+        params = {"brands": brand.slug}
+        res = self.client.get(reverse("api-1.0.0:product_list"), params)
+        self.assertEqual(res.json()["count"], self.PRODUCTS_SIZE_PER_BRAND)
+
+        # Another page of the same selection reuses the count.
+        with self.assertNumQueries(1):
+            self.client.get(reverse("api-1.0.0:product_list"), {**params, "page": 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductFactory.create(brand=brand)
+        res = self.client.get(reverse("api-1.0.0:product_list"), params)
+        self.assertEqual(res.json()["count"], self.PRODUCTS_SIZE_PER_BRAND + 1)
+
+    def test_product_list_facets(self):
+        brand = self.brands[0]
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"facets": True, "brands": brand.slug, "gender": "M"},
+        )
+        self.assertEqual(res.status_code, 200)
+        facets = res.json()["facets"]
+
+        # Each facet is counted under the other facets' selection.
+        in_brand = Product.objects.filter(brand=brand)
+        self.assertEqual(facets["gender"]["M"], in_brand.filter(gender="M").count())
+        self.assertEqual(
+            facets["brands"],
+            {
+                b.slug: Product.objects.filter(brand=b, gender="M").count()
+                for b in self.brands
+                if Product.objects.filter(brand=b, gender="M").exists()
+            },
+        )
+        self.assertEqual(
+            facets["groups"][self.groups[0].slug],
+            in_brand.filter(gender="M", groups=self.groups[0]).count(),
+        )
+
+    def test_product_list_facets_group_filter(self):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                reverse("api-1.0.0:product_list"),
+                {"facets": True, "groups": self.groups[-1].slug},
+            )
+        self.assertEqual(res.status_code, 200)
+        facets = res.json()["facets"]
+
+        # Only the last brand's products are in the last group.
+        self.assertEqual(
+            facets["brands"], {self.brands[-1].slug: self.PRODUCTS_SIZE_PER_BRAND}
+        )
+        self.assertEqual(facets["groups"][self.groups[0].slug], self.PRODUCTS_SIZE)
+        self.assertEqual(
+            facets["groups"][self.groups[-1].slug], self.PRODUCTS_SIZE_PER_BRAND
+        )
+        # All the facets in one query.
+        self.assertEqual(
+            len([q for q in queries if "UNION ALL" in q["sql"]]), 1, queries
+        )
+
+    def test_product_list_facets_price_filter(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"facets": True, "max_price": "300", "size": 15},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            sum(res.json()["facets"]["gender"].values()), res.json()["count"]
+        )
+
+    def test_product_list_facets_search(self):
+        product = self.products[0][0]
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"facets": True, "search": product.name}
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(res.json()["count"], 0)
+        self.assertEqual(
+            sum(res.json()["facets"]["gender"].values()), res.json()["count"]
+        )
+
+    def test_product_list_facets_follow_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            group = GroupFactory.create()
+            product = ProductFactory.create(gender="F", groups=[group])
+
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"facets": True})
+        self.assertEqual(res.json()["facets"]["groups"][group.slug], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            group.products.remove(product)
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"facets": True})
+        self.assertNotIn(group.slug, res.json()["facets"]["groups"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"facets": True})
+        self.assertEqual(
+            sum(res.json()["facets"]["gender"].values()), Product.objects.count()
+        )
+
+    def test_product_list_cursor(self):
+        for ordering in [None, "name", "-price_per_gram", "-sales", "price_15"]:
+            params = {"ordering": ordering} if ordering else {}
+            seen = []
+            cursor = ""
+
+            while cursor is not None:
+                res = self.client.get(
+                    reverse("api-1.0.0:product_list"), {**params, "cursor": cursor}
+                )
+                self.assertEqual(res.status_code, 200)
+                seen += [product["id"] for product in res.json()["data"]]
+                cursor = res.json()["next_cursor"]
+
+            self.assertEqual(len(seen), len(set(seen)))
+            self.assertEqual(len(seen), Product.objects.count())
+
+    def test_product_list_cursor_ordering(self):
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"ordering": "name", "cursor": ""}
+        )
+        cursor = res.json()["next_cursor"]
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"ordering": "name", "cursor": cursor}
+        )
+        names = [product["name"] for product in res.json()["data"]]
+        self.assertEqual(names, sorted(names))
+
+    def test_product_list_invalid_cursor(self):
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"cursor": "wrong"})
+        self.assertEqual(res.status_code, 422)
+
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"), {"ordering": "name", "cursor": ""}
+        )
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"ordering": "-sales", "cursor": res.json()["next_cursor"]},
+        )
+        self.assertEqual(res.status_code, 422)
+
+    def test_product_list_cursor_value_types(self):
+        def cursor(ordering, values):
+            payload = json.dumps([ordering, values]).encode()
+            return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+        for ordering, values in [
+            ("name", [["a"], 1]),
+            ("name", [{"a": 1}, 1]),
+            ("name", [1, 1]),
+            ("-sales", ["10", 1]),
+            ("-sales", [True, 1]),
+            ("price_15", [None, 1]),
+            ("price_15", ["cheap", 1]),
+        ]:
+            with self.subTest(ordering=ordering, values=values):
+                # Rejected before the count query.
+                with self.assertNumQueries(0):
+                    res = self.client.get(
+                        reverse("api-1.0.0:product_list"),
+                        {"ordering": ordering, "cursor": cursor(ordering, values)},
+                    )
+                self.assertEqual(res.status_code, 422)
+
+        res = self.client.get(
+            reverse("api-1.0.0:product_list"),
+            {"ordering": "price_15", "cursor": cursor("price_15", ["12.50", 1])},
+        )
+        self.assertEqual(res.status_code, 200)
+
+
+class ProductSearchAPIViewTest(NinjaTestCase):
+    def setUp(self):
+        self.dior = BrandFactory.create(name="Dior")
+        self.chanel = BrandFactory.create(name="Chanel")
+        self.sauvage = ProductFactory.create(brand=self.dior, name="Sauvage")
+        self.sauvage_elixir = ProductFactory.create(
+            brand=self.dior, name="Sauvage Elixir Sauvage"
+        )
+        self.coco = ProductFactory.create(brand=self.chanel, name="Coco Mademoiselle")
+
+    def search(self, text):
+        res = self.client.get(reverse("api-1.0.0:product_list"), {"search": text})
+        self.assertEqual(res.status_code, 200)
+        return [product["id"] for product in res.json()["data"]]
+
+    def test_search_index_available(self):
+        self.assertTrue(search.is_available())
+
+    def test_search_product_name_prefix(self):
+        ids = self.search("sauv")
+        self.assertEqual(set(ids), {self.sauvage.id, self.sauvage_elixir.id})
+
+    def test_search_brand_name(self):
+        self.assertEqual(self.search("chanel"), [self.coco.id])
+
+    def test_search_ranked_by_relevance(self):
+        self.assertEqual(
+            self.search("sauvage"), [self.sauvage_elixir.id, self.sauvage.id]
+        )
+
+    def test_search_index_follows_writes(self):
+        self.chanel.name = "Creed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.chanel.save()
+        self.assertEqual(self.search("creed"), [self.coco.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.coco.delete()
+        self.assertEqual(self.search("creed"), [])
+
+    def test_search_fallback_without_index(self):
+        with patch.dict(search._available, {"default": False}):
+            self.assertEqual(self.search("Mademoiselle"), [self.coco.id])
+
+
+class ProductSuggestAPIViewTest(NinjaTestCase):
+    def setUp(self):
+        self.dior = BrandFactory.create(name="Dior")
+        self.sauvage = ProductFactory.create(brand=self.dior, name="Sauvage")
+        self.coco = ProductFactory.create(
+            brand=BrandFactory.create(name="Chanel"), name="Coco Mademoiselle"
+        )
+        suggest_index.build(catalog_version())
+
+    def suggest(self, q):
+        res = self.client.get(reverse("api-1.0.0:product_suggest"), {"q": q})
+        self.assertEqual(res.status_code, 200)
+        return [(item["kind"], item["id"]) for item in res.json()]
+
+    def test_suggest_prefix(self):
+        self.assertEqual(
+            self.suggest("di"), [("brand", self.dior.id), ("product", self.sauvage.id)]
+        )
+        self.assertEqual(self.suggest("dior sau")[0], ("product", self.sauvage.id))
+
+    def test_suggest_typo(self):
+        self.assertIn(("product", self.coco.id), self.suggest("madmoiselle"))
+
+    def test_suggest_without_queries(self):
+        with self.assertNumQueries(0):
+            self.suggest("sauvage")
+
+    def test_suggest_follows_writes(self):
+        self.dior.name = "Christian Dior"
+        self.dior.save()
+        self.assertIn(("product", self.sauvage.id), self.suggest("christian"))
+
+        product = ProductFactory.create(brand=self.dior, name="Fahrenheit")
+        self.assertEqual(self.suggest("fahr"), [("product", product.id)])
+
+        product.delete()
+        self.assertEqual(self.suggest("fahr"), [])
+
+    def test_suggest_write_during_build(self):
+        load = suggest_index._load
+
+        def load_then_write():
+            load()
+            # Saved after the index read the products, replayed at the end.
+            self.written = ProductFactory.create(brand=self.dior, name="Fahrenheit")
+
+        with patch.object(suggest_index, "_load", load_then_write):
+            suggest_index.build(catalog_version())
+
+        self.assertEqual(self.suggest("fahr"), [("product", self.written.id)])
+
+    def test_suggest_follows_other_workers(self):
+        # Written without this process's signals, as by another worker.
+        Product.objects.filter(pk=self.coco.pk).update(name="Fahrenheit")
+        self.assertEqual(self.suggest("fahr"), [])
+
+        bump_catalog_version()
+        self.assertEqual(self.suggest("fahr"), [("product", self.coco.id)])
+
+        with self.assertNumQueries(0):
+            self.suggest("fahr")
+
+    def test_suggest_failed_build(self):
+        bump_catalog_version()
+        with patch.object(
+            suggest_index, "_load", side_effect=DatabaseError
+        ), self.assertLogs("store.indexes", "ERROR"):
+            res = self.client.get(reverse("api-1.0.0:product_suggest"), {"q": "sau"})
+        self.assertEqual(res.status_code, 503)
+
+        # Retried by the next request.
+        self.assertEqual(self.suggest("sau"), [("product", self.sauvage.id)])
+
+    def test_suggest_built_at_startup(self):
+        bump_catalog_version()
+        with patch.object(suggest_index, "build") as build:
+            build_indexes()
+        build.assert_called_once_with(catalog_version())
+
+
+class CatalogResponseCacheTest(NinjaTestCase):
+    def setUp(self):
+        self.brands = BrandFactory.create_batch(3)
+        self.products = ProductFactory.create_batch(3, brand=self.brands[0])
+
+    def test_anonymous_response_cached(self):
+        res = self.client.get(reverse("api-1.0.0:brand_list"))
+        self.assertEqual(res.status_code, 200)
+        self.assertIn("ETag", res)
+        self.assertIn("Last-Modified", res)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse("api-1.0.0:brand_list"))
+        self.assertEqual(cached.content, res.content)
+
+    def test_conditional_get_not_modified(self):
+        url = self.products[0].get_absolute_url()
+        res = self.client.get(url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(url, headers={"If-None-Match": res["ETag"]})
+        self.assertEqual(res.status_code, 304)
+
+    def test_cache_key_normalizes_query(self):
+        url = reverse("api-1.0.0:product_list")
+        brands = [("brands", brand.slug) for brand in self.brands[:2]]
+        res = self.client.get(url, brands)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, brands[::-1])
+        self.assertEqual(cached.content, res.content)
+
+    def test_cache_invalidated_on_write(self):
+        self.client.get(reverse("api-1.0.0:brand_list"))
+        with self.captureOnCommitCallbacks(execute=True):
+            BrandFactory.create()
+        res = self.client.get(reverse("api-1.0.0:brand_list"))
+        self.assertEqual(len(res.json()), len(self.brands) + 1)
+
+    def test_cache_invalidated_after_commit(self):
+        version = caches["catalog"].get(CATALOG_VERSION_KEY)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            BrandFactory.create()
+            # A read before the commit would cache the old rows.
+            self.assertEqual(caches["catalog"].get(CATALOG_VERSION_KEY), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(caches["catalog"].get(CATALOG_VERSION_KEY), version)
+
+    def test_authenticated_not_cached(self):
+        user = UserFactory.create()
+        self.client.force_login(user)
+        res = self.client.get(reverse("api-1.0.0:brand_list"))
+        self.assertNotIn("ETag", res)
+
+    @override_settings(
+        CACHES={**settings.CACHES, "catalog": settings.CATALOG_CACHES["database"]}
+    )
+    def test_cache_invalidated_across_workers(self):
+        call_command("createcachetable", verbosity=0)
+        self.client.get(reverse("api-1.0.0:brand_list"))
+
+        # Another worker has a backend instance of its own, on the same table.
+        other = caches.create_connection("catalog")
+        version = other.get(CATALOG_VERSION_KEY)
+        self.assertIsNotNone(version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BrandFactory.create()
+        self.assertGreater(other.get(CATALOG_VERSION_KEY), version)
+        res = self.client.get(reverse("api-1.0.0:brand_list"))
+        self.assertEqual(len(res.json()), len(self.brands) + 1)
+
+
+class FavoriteOverlayTest(NinjaTestCase):
+    def setUp(self):
+        self.user = UserFactory.create()
+        self.products = ProductFactory.create_batch(3)
+        self.favorite = FavoriteFactory.create(user=self.user, product=self.products[0])
+
+    def favorite_ids(self):
+        res = self.client.get(reverse("api-1.0.0:product_list"))
+        self.assertEqual(res.status_code, 200)
+        return {product["id"]: product["favorite_id"] for product in res.json()["data"]}
+
+    def test_product_list_overlay(self):
+        self.client.get(reverse("api-1.0.0:product_list"))  # shared page, anonymous
+        self.client.force_login(self.user)
+
+        favorite_ids = self.favorite_ids()
+        self.assertEqual(favorite_ids[self.products[0].id], self.favorite.id)
+        self.assertIsNone(favorite_ids[self.products[1].id])
+
+        res = self.client.get(self.products[0].get_absolute_url())
+        self.assertEqual(res.json()["favorite_id"], self.favorite.id)
+
+    def test_overlay_not_leaked_to_anonymous(self):
+        self.client.force_login(self.user)
+        self.favorite_ids()
+        self.client.logout()
+
+        self.assertEqual(set(self.favorite_ids().values()), {None})
+
+    def test_overlay_follows_favorite_writes(self):
+        self.client.force_login(self.user)
+        self.favorite_ids()
+
+        res = self.client.post(
+            reverse("api-1.0.0:favorite_list"),
+            {"product_id": self.products[1].id},
+            content_type="application/json",
+        )
+        self.assertEqual(self.favorite_ids()[self.products[1].id], res.json()["id"])
+
+        self.client.delete(
+            reverse(
+                "api-1.0.0:favorite_destroy", kwargs={"favorite_id": self.favorite.id}
+            )
+        )
+        self.assertIsNone(self.favorite_ids()[self.products[0].id])
+
+    @override_settings(
+        CACHES={**settings.CACHES, "catalog": settings.CATALOG_CACHES["database"]}
+    )
+    def test_overlay_invalidated_across_workers(self):
+        call_command("createcachetable", verbosity=0)
+        self.client.force_login(self.user)
+        self.favorite_ids()
+
+        # Another worker has a backend instance of its own, on the same table.
+        other = caches.create_connection("catalog")
+        key = Favorite.objects.cache_key(self.user.pk)
+        self.assertEqual(other.get(key), {self.products[0].id: self.favorite.id})
+
+        self.favorite.delete()
+        self.assertIsNone(other.get(key))
+
 
 class ProductRetrieveAPIViewTest(NinjaTestCase):
     def setUp(self):
@@ -297,6 +820,51 @@ class OrderCreateAPIView(NinjaTestCase):
             self.assertTrue(item.quantity, self.items[i]["quantity"])
             self.assertTrue(item.size, self.items[i]["size"])
 
+    def test_order_price_rendered(self):
+        products = [
+            ProductFactory.create(price_per_gram="29.46"),
+            ProductFactory.create(price_per_gram="0.10"),
+            ProductFactory.create(price_per_gram="2.00"),
+        ]
+        self.client.force_login(self.user)
+
+        prices = []
+        for items in [
+            [
+                {"product_id": products[0].id, "size": 15, "quantity": 1},
+                {"product_id": products[1].id, "size": 30, "quantity": 3},
+            ],
+            [{"product_id": products[2].id, "size": 30, "quantity": 1}],
+        ]:
+            res = self.client.post(
+                reverse("api-1.0.0:order_list"),
+                {"phone": self.phone, "address": self.address, "items": items},
+                content_type="application/json",
+            )
+            prices.append(res.json()["price"])
+        self.assertEqual(prices, ["450.90", "60.00"])
+
+        # The strings, not the Decimals: 450.9 == 450.900000000000.
+        res = self.client.get(reverse("api-1.0.0:order_list"))
+        self.assertEqual(sorted(order["price"] for order in res.json()), prices)
+        order = Order.objects.with_totals().get(id=res.json()[0]["id"])
+        self.assertEqual(str(order.price), res.json()[0]["price"])
+
+    def test_order_create_queues_email(self):
+        self.client.force_login(self.user)
+        res = self.client.post(
+            reverse("api-1.0.0:order_list"),
+            {"phone": self.phone, "address": self.address, "items": self.items},
+            content_type="application/json",
+        )
+        self.assertEqual(res.status_code, 201)
+
+        # Nothing is sent on the request path, the email waits in the outbox.
+        self.assertEqual(len(mail.outbox), 0)
+        email = EmailOutbox.objects.get()
+        self.assertEqual(email.recipients, [self.user.email])
+        self.assertIn(str(res.json()["id"]), email.subject)
+
     def test_order_create_empty(self):
         self.client.force_login(self.user)
         res = self.client.post(